@@ -0,0 +1,56 @@
+"""Add product_categories association table and backfill it from category_id/category_ids.
+
+Revision ID: a2b3c4d5e6f7
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "a2b3c4d5e6f7"
+down_revision: Union[str, None] = "f1a2b3c4d5e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # The app's startup create_all may have created it already.
+    if "product_categories" in sa.inspect(bind).get_table_names():
+        return
+    op.create_table(
+        "product_categories",
+        sa.Column("product_id", sa.Uuid(), sa.ForeignKey("products.id"), primary_key=True),
+        sa.Column("category_id", sa.Uuid(), sa.ForeignKey("categories.id"), primary_key=True),
+    )
+    op.create_index(
+        "ix_product_categories_category_product",
+        "product_categories",
+        ["category_id", "product_id"],
+    )
+
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            """
+            INSERT INTO product_categories (product_id, category_id)
+            SELECT DISTINCT m.product_id, m.category_id
+            FROM (
+                SELECT id AS product_id, category_id FROM products WHERE category_id IS NOT NULL
+                UNION
+                SELECT p.id, elem::uuid
+                FROM products p, jsonb_array_elements_text(coalesce(p.category_ids::jsonb, '[]'::jsonb)) AS elem
+                WHERE elem ~* '^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$'
+            ) m
+            JOIN categories c ON c.id = m.category_id
+            ON CONFLICT DO NOTHING
+            """
+        )
+    # Other databases are backfilled by run_startup_migrations.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_categories_category_product", table_name="product_categories")
+    op.drop_table("product_categories")
@@ -0,0 +1,51 @@
+"""Add category_closure table and fill it from categories.parent_id.
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "b3c4d5e6f7a8"
+down_revision: Union[str, None] = "a2b3c4d5e6f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # The app's startup create_all may have created it already.
+    if "category_closure" in sa.inspect(bind).get_table_names():
+        return
+    op.create_table(
+        "category_closure",
+        sa.Column("ancestor_id", sa.Uuid(), sa.ForeignKey("categories.id"), primary_key=True),
+        sa.Column("descendant_id", sa.Uuid(), sa.ForeignKey("categories.id"), primary_key=True),
+        sa.Column("depth", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            """
+            WITH RECURSIVE tree (ancestor_id, descendant_id, depth, path) AS (
+                SELECT id, id, 0, ARRAY[id] FROM categories
+                UNION ALL
+                SELECT c.parent_id, t.descendant_id, t.depth + 1, t.path || c.parent_id
+                FROM tree t
+                JOIN categories c ON c.id = t.ancestor_id
+                JOIN categories p ON p.id = c.parent_id
+                WHERE NOT c.parent_id = ANY(t.path)
+            )
+            INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, descendant_id, depth FROM tree
+            """
+        )
+    # Other databases are filled by run_startup_migrations.
+
+
+def downgrade() -> None:
+    op.drop_table("category_closure")
@@ -0,0 +1,60 @@
+"""Add stored discount_percent and primary_image_url to products.
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c4d5e6f7a8b9"
+down_revision: Union[str, None] = "b3c4d5e6f7a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("products")}
+    # The app's startup migrations may have added them already.
+    if "discount_percent" not in columns:
+        op.add_column(
+            "products",
+            sa.Column("discount_percent", sa.Numeric(5, 2), nullable=False, server_default="0"),
+        )
+    if "primary_image_url" not in columns:
+        op.add_column("products", sa.Column("primary_image_url", sa.String(length=500), nullable=True))
+    if "ix_products_discount_percent" not in {index["name"] for index in inspector.get_indexes("products")}:
+        op.create_index("ix_products_discount_percent", "products", ["discount_percent"])
+
+    op.execute(
+        """
+        UPDATE products SET discount_percent = CASE
+            WHEN mrp > 0 AND selling_price < mrp THEN ROUND((mrp - selling_price) * 100 / mrp, 2)
+            ELSE 0
+        END
+        """
+    )
+    op.execute(
+        """
+        UPDATE products SET primary_image_url = COALESCE(
+            image_url,
+            (
+                SELECT pi.image_url FROM product_images pi
+                WHERE pi.product_id = products.id
+                ORDER BY pi.is_primary DESC, pi.sort_order ASC, pi.created_at ASC
+                LIMIT 1
+            )
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_discount_percent", table_name="products")
+    op.drop_column("products", "primary_image_url")
+    op.drop_column("products", "discount_percent")
@@ -0,0 +1,53 @@
+"""Add products.units_sold and the indexes behind the public sort orderings.
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "d5e6f7a8b9c0"
+down_revision: Union[str, None] = "c4d5e6f7a8b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_INDEXES = {
+    "idx_products_active_created_id": "(is_active, created_at DESC, id DESC)",
+    "idx_products_active_price_id": "(is_active, selling_price, id)",
+    "idx_products_active_discount_id": "(is_active, discount_percent DESC, id DESC)",
+    "idx_products_active_name_id": "(is_active, name, id)",
+    "idx_products_active_units_sold_id": "(is_active, units_sold DESC, id DESC)",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # The app's startup migrations may have added it already.
+    if "units_sold" not in {column["name"] for column in sa.inspect(bind).get_columns("products")}:
+        op.add_column(
+            "products",
+            sa.Column("units_sold", sa.Integer(), nullable=False, server_default="0"),
+        )
+    op.execute(
+        """
+        UPDATE products SET units_sold = COALESCE((
+            SELECT SUM(oi.quantity) FROM order_items oi
+            JOIN orders o ON o.id = oi.order_id
+            WHERE oi.product_id = products.id
+              AND NOT oi.is_cancelled
+              AND o.status <> 'CANCELLED'
+        ), 0)
+        """
+    )
+    for name, columns in SORT_INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON products {columns}")
+
+
+def downgrade() -> None:
+    for name in SORT_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.drop_column("products", "units_sold")
@@ -0,0 +1,81 @@
+"""Add full-text search for products (tsvector + GIN on Postgres, FTS5 on SQLite).
+
+Revision ID: d9e0f1a2b3c4
+Revises: c8d9e0f1a2b3
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "d9e0f1a2b3c4"
+down_revision: Union[str, None] = "c8d9e0f1a2b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """
+            ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(sku, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(short_description, '')), 'C') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+            ) STORED
+            """
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING GIN (search_vector)")
+        return
+
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+            name, sku, short_description, description,
+            content='products', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+            INSERT INTO products_fts (rowid, name, sku, short_description, description)
+            VALUES (new.rowid, new.name, new.sku, new.short_description, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, sku, short_description, description)
+            VALUES ('delete', old.rowid, old.name, old.sku, old.short_description, old.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+            INSERT INTO products_fts (products_fts, rowid, name, sku, short_description, description)
+            VALUES ('delete', old.rowid, old.name, old.sku, old.short_description, old.description);
+            INSERT INTO products_fts (rowid, name, sku, short_description, description)
+            VALUES (new.rowid, new.name, new.sku, new.short_description, new.description);
+        END
+        """
+    )
+    op.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_products_search_vector")
+        op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+    op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,41 @@
+"""Add trigram index for typo-tolerant product search (Postgres only).
+
+Revision ID: e0f1a2b3c4d5
+Revises: d9e0f1a2b3c4
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "e0f1a2b3c4d5"
+down_revision: Union[str, None] = "d9e0f1a2b3c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite uses an in-process trigram index instead.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT unaccent('unaccent'::regdictionary, $1) $$
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products "
+        "USING GIN (immutable_unaccent(lower(name)) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS idx_products_name_trgm")
+    op.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
@@ -0,0 +1,49 @@
+"""Add brand_stats rollup and fill it from active products.
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "e6f7a8b9c0d1"
+down_revision: Union[str, None] = "d5e6f7a8b9c0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # The app's startup create_all may have created it already.
+    if "brand_stats" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "brand_stats",
+            sa.Column("brand_id", sa.Uuid(), sa.ForeignKey("brands.id"), primary_key=True),
+            sa.Column("product_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("max_discount", sa.Numeric(5, 2), nullable=False, server_default="0"),
+            sa.Column("min_price", sa.Numeric(10, 2), nullable=False, server_default="0"),
+            sa.Column("max_price", sa.Numeric(10, 2), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_brand_stats_max_discount", "brand_stats", ["max_discount"])
+
+    op.execute("DELETE FROM brand_stats")
+    op.execute(
+        """
+        INSERT INTO brand_stats (brand_id, product_count, max_discount, min_price, max_price, updated_at)
+        SELECT brand_id, COUNT(id), COALESCE(MAX(discount_percent), 0),
+               MIN(selling_price), MAX(selling_price), CURRENT_TIMESTAMP
+        FROM products
+        WHERE is_active AND brand_id IS NOT NULL
+        GROUP BY brand_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_brand_stats_max_discount", table_name="brand_stats")
+    op.drop_table("brand_stats")
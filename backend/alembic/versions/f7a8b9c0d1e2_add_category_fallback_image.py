@@ -0,0 +1,40 @@
+"""Add categories.fallback_image_url and compute it from member products.
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "f7a8b9c0d1e2"
+down_revision: Union[str, None] = "e6f7a8b9c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # The app's startup migrations may have added it already.
+    if "fallback_image_url" not in {column["name"] for column in sa.inspect(bind).get_columns("categories")}:
+        op.add_column("categories", sa.Column("fallback_image_url", sa.String(length=500), nullable=True))
+    op.execute(
+        """
+        UPDATE categories SET fallback_image_url = (
+            SELECT p.primary_image_url FROM products p
+            JOIN product_categories pc ON pc.product_id = p.id
+            WHERE pc.category_id = categories.id
+              AND p.is_active
+              AND p.primary_image_url IS NOT NULL
+            ORDER BY p.is_featured DESC, p.created_at DESC
+            LIMIT 1
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("categories", "fallback_image_url")
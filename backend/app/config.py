@@ -79,7 +79,46 @@ class Settings(BaseSettings):
     
     # Rate Limiting
     rate_limit_per_minute: int = 60
-    
+
+    # Public response cache (per worker)
+    response_cache_max_entries: int = 2000
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_sweep_seconds: int = 30
+    response_cache_fill_timeout_seconds: float = 15.0
+    # How long the last good payload keeps being served when rebuilds fail
+    response_cache_stale_if_error_seconds: int = 3600
+    # Optional host-wide tier shared by all workers (SQLite file path)
+    response_cache_shared_path: Optional[str] = None
+    response_cache_broadcast_ms: int = 20
+    # Rebuild the hottest keys at startup and shortly after invalidations
+    response_cache_warm_enabled: bool = True
+    response_cache_warm_debounce_seconds: float = 2.0
+    response_cache_warm_top_products: int = 20
+    # In-process catalog indexes (category registry, product snapshot,
+    # suggest and fuzzy indexes) re-sync at least this often, even on
+    # workers that miss a version bump
+    catalog_index_max_age_seconds: int = 300
+
+    # Typo-tolerant product search (trigram similarity, 0-1)
+    product_fuzzy_threshold: float = 0.4
+    product_fuzzy_max_results: int = 500
+    # Retry searches that match nothing with fuzzy matching
+    product_fuzzy_fallback: bool = True
+
+    # Product listing totals: exact counts are cached until the next catalog
+    # write; "estimate" uses the Postgres planner above this many rows
+    product_count_cache_seconds: int = 300
+    product_count_estimate_min_rows: int = 10000
+
+    # Serve filter/sort/paginate listings from an in-memory columnar snapshot
+    # of the active catalog (needs numpy)
+    product_snapshot_enabled: bool = False
+
+    # Facet counts on listings: price histogram bucket edges (upper bounds);
+    # counts are cached per filter set until the next catalog write
+    product_facet_price_edges: List[int] = [100, 250, 500, 1000, 2500, 5000]
+    product_facet_cache_seconds: int = 300
+
     @property
     def is_production(self) -> bool:
         return self.app_env == "production"
@@ -1,34 +1,506 @@
 """Tiny in-process TTL cache for public read-heavy API responses."""
 
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
 from time import monotonic
-from typing import Any, Hashable
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core.encoded_response import EncodedPayload
+from app.core.exceptions import ServiceUnavailableException
+from app.core.shared_cache import SharedCacheTier
+
+Tags = Iterable[str] | Callable[[Any], Iterable[str]]
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    value: Any
+    size: int
+    prefix: str
+    tags: tuple[str, ...] = ()
+    # Served while a background refresh runs.
+    stale_until: float = 0.0
+    # Served when a rebuild fails (e.g. database unreachable).
+    error_until: float = 0.0
+
+    @property
+    def drop_at(self) -> float:
+        return max(self.expires_at, self.stale_until, self.error_until)
+
+
+@dataclass
+class CacheTrace:
+    """How one ``get_or_set`` call was served, for ``Server-Timing`` headers."""
+
+    # hit | stale | miss | shared | error
+    outcome: str = ""
+    # Time spent in the factory by the rebuild this call waited on.
+    rebuild_ms: float | None = None
+
+
+def _key_prefix(key: Hashable) -> str:
+    if isinstance(key, tuple) and key:
+        return str(key[0])
+    return str(key)
+
+
+def product_tag(product_id: Any) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category_id: Any) -> str:
+    return f"category:{category_id}"
+
+
+def brand_tag(brand_id: Any) -> str:
+    return f"brand:{brand_id}"
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate payload size by its compact JSON encoding."""
+    if isinstance(value, EncodedPayload):
+        return value.size
+    try:
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return 0
 
 
 class TTLCache:
-    """Simple per-process cache for JSON-safe public responses."""
+    """
+    Per-process LRU cache for JSON-safe public responses.
+
+    Bounded by entry count and an approximate byte budget; least recently
+    used entries are evicted first. Expired entries are dropped on read and
+    by a periodic background sweep.
+
+    Keys are indexed by prefix (the first tuple element) and by optional
+    tags such as ``product:<id>``, so invalidation only touches the
+    affected entries instead of scanning the whole cache.
+
+    ``get_or_set`` coalesces concurrent misses: one task per key rebuilds the
+    value while other callers await the same result. Entries may also carry
+    a stale window, served immediately while a background refresh runs, and
+    a stale-if-error window, served when a rebuild fails.
+
+    With a ``SharedCacheTier`` attached, local misses read through the
+    host-wide tier before rebuilding, and invalidations are broadcast to
+    the other workers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        max_bytes: int = 64 * 1024 * 1024,
+        fill_timeout_seconds: float = 15.0,
+        stale_if_error_seconds: int = 0,
+        shared: SharedCacheTier | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.fill_timeout_seconds = fill_timeout_seconds
+        self.stale_if_error_seconds = stale_if_error_seconds
+        self.shared = shared
+        self._items: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._by_prefix: dict[str, set[Hashable]] = {}
+        self._by_tag: dict[str, set[Hashable]] = {}
+        self._bytes = 0
+        self._stats: dict[str, dict[str, int]] = {}
+        self._sweeper: asyncio.Task | None = None
+        self._shared_sync: asyncio.Task | None = None
+        # Each in-flight fill remembers the generation it started in.
+        self._inflight: dict[Hashable, tuple[asyncio.Future, int]] = {}
+        # Bumped by every invalidation so in-flight fills started before it
+        # don't store (or hand out) results computed from pre-write data.
+        self._generation = 0
+        self._broadcast_handlers: dict[str, Callable[[str], None]] = {}
+        self._invalidation_listeners: list[Callable[[], None]] = []
+
+    def _prefix_stats(self, prefix: str) -> dict[str, int]:
+        stats = self._stats.get(prefix)
+        if stats is None:
+            stats = self._stats[prefix] = {
+                "entries": 0,
+                "bytes": 0,
+                "hits": 0,
+                "misses": 0,
+                "evictions": 0,
+                "expirations": 0,
+                "coalesced": 0,
+                "stale_served": 0,
+                "error_served": 0,
+                "shared_hits": 0,
+                "rebuilds": 0,
+                "rebuild_failures": 0,
+                "rebuild_ms": 0,
+                "not_modified": 0,
+            }
+        return stats
+
+    def record(self, prefix: str, counter: str) -> None:
+        """Bump a per-prefix counter tracked outside the cache (e.g. ``not_modified``)."""
+        self._prefix_stats(prefix)[counter] += 1
+
+    def _remove(self, key: Hashable, reason: str | None = None) -> None:
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        self._unindex(self._by_prefix, entry.prefix, key)
+        for tag in entry.tags:
+            self._unindex(self._by_tag, tag, key)
+        stats = self._prefix_stats(entry.prefix)
+        stats["entries"] -= 1
+        stats["bytes"] -= entry.size
+        if reason:
+            stats[reason] += 1
+
+    @staticmethod
+    def _unindex(index: dict[str, set[Hashable]], name: str, key: Hashable) -> None:
+        keys = index.get(name)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del index[name]
 
-    def __init__(self) -> None:
-        self._items: dict[Hashable, tuple[float, Any]] = {}
+    def _lookup(self, key: Hashable, now: float) -> _Entry | None:
+        """Return the entry for ``key`` while it is still servable in any window."""
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        if entry.drop_at <= now:
+            self._remove(key, "expirations")
+            return None
+        self._items.move_to_end(key)
+        return entry
 
     def get(self, key: Hashable) -> Any | None:
-        item = self._items.get(key)
-        if not item:
-            return None #yes
+        """Return the value for ``key`` only while it is fresh."""
+        entry = self._lookup(key, monotonic())
+        if entry is None or entry.expires_at <= monotonic():
+            self._prefix_stats(_key_prefix(key))["misses"] += 1
+            return None
+
+        self._prefix_stats(entry.prefix)["hits"] += 1
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: int,
+        tags: Iterable[str] = (),
+        stale_seconds: int = 0,
+        stale_if_error_seconds: int | None = None,
+    ) -> None:
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        if stale_if_error_seconds is None:
+            stale_if_error_seconds = self.stale_if_error_seconds
+        self._remove(key)
+        prefix = _key_prefix(key)
+        entry_tags = tuple(dict.fromkeys(tags))
+        expires_at = monotonic() + ttl_seconds
+        self._items[key] = _Entry(
+            expires_at,
+            value,
+            size,
+            prefix,
+            entry_tags,
+            stale_until=expires_at + stale_seconds,
+            error_until=expires_at + stale_if_error_seconds,
+        )
+        self._bytes += size
+        self._by_prefix.setdefault(prefix, set()).add(key)
+        for tag in entry_tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        stats = self._prefix_stats(prefix)
+        stats["entries"] += 1
+        stats["bytes"] += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._items))
+            self._remove(oldest, "evictions")
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        ttl_seconds: int,
+        tags: Tags = (),
+        stale_seconds: int = 0,
+        stale_if_error_seconds: int | None = None,
+        timeout_seconds: float | None = None,
+        trace: CacheTrace | None = None,
+    ) -> EncodedPayload:
+        """
+        Return the cached payload for ``key`` or build it with ``factory``.
+
+        The factory returns JSON-safe content, which is encoded and
+        compressed once into an ``EncodedPayload`` before being stored.
+        Only one factory call runs per key at a time; concurrent callers
+        await it and receive its result or its exception. The factory runs
+        detached from the caller, so it must not use request-scoped state
+        such as the request's DB session. ``tags`` may be a callable that
+        derives tags from the built content.
+
+        Within ``stale_seconds`` after expiry the old value is returned at
+        once and refreshed in the background. Within
+        ``stale_if_error_seconds`` (default: the cache-wide setting) the old
+        value is returned when the rebuild fails or times out.
+
+        Pass a ``CacheTrace`` to learn how the call was served.
+        """
+        trace = trace or CacheTrace()
+        now = monotonic()
+        entry = self._lookup(key, now)
+        stats = self._prefix_stats(_key_prefix(key))
+        if entry is not None and entry.expires_at > now:
+            stats["hits"] += 1
+            trace.outcome = "hit"
+            return entry.value
+
+        stats["misses"] += 1
+        fill_args = (factory, ttl_seconds, tags, stale_seconds, stale_if_error_seconds)
+        if entry is not None and entry.stale_until > now:
+            stats["stale_served"] += 1
+            trace.outcome = "stale"
+            self._start_fill(key, *fill_args)
+            return entry.value
+
+        fill = self._start_fill(key, *fill_args)
+        try:
+            payload, rebuild_ms = await asyncio.wait_for(
+                asyncio.shield(fill),
+                timeout_seconds or self.fill_timeout_seconds,
+            )
+            trace.outcome = "miss" if rebuild_ms is not None else "shared"
+            trace.rebuild_ms = rebuild_ms
+            return payload
+        except Exception as exc:
+            if isinstance(exc, HTTPException):
+                raise
+            # The entry may have been invalidated while we waited.
+            if entry is not None and self._items.get(key) is entry and entry.error_until > monotonic():
+                stats["error_served"] += 1
+                trace.outcome = "error"
+                return entry.value
+            if isinstance(exc, asyncio.TimeoutError):
+                raise ServiceUnavailableException()
+            raise
+
+    def _start_fill(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        ttl_seconds: int,
+        tags: Tags,
+        stale_seconds: int,
+        stale_if_error_seconds: int | None,
+    ) -> asyncio.Future:
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[1] == self._generation:
+            self._prefix_stats(_key_prefix(key))["coalesced"] += 1
+            return inflight[0]
+
+        fill = asyncio.ensure_future(
+            self._fill(key, factory, ttl_seconds, tags, stale_seconds, stale_if_error_seconds)
+        )
+        self._inflight[key] = (fill, self._generation)
+        fill.add_done_callback(lambda done: self._fill_done(key, done))
+        return fill
 
-        expires_at, value = item
-        if expires_at <= monotonic():
-            self._items.pop(key, None)
+    async def _fill(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        ttl_seconds: int,
+        tags: Tags,
+        stale_seconds: int,
+        stale_if_error_seconds: int | None,
+    ) -> tuple[EncodedPayload, float | None]:
+        """Build and store ``key``; returns the payload and the factory time (None for a shared hit)."""
+        generation = self._generation
+        rebuild_ms = None
+        shared_hit = await self._shared_call(self.shared.get, key) if self.shared else None
+        if shared_hit is not None:
+            payload, ttl_seconds, entry_tags = shared_hit
+            self._prefix_stats(_key_prefix(key))["shared_hits"] += 1
+        else:
+            stats = self._prefix_stats(_key_prefix(key))
+            started = monotonic()
+            try:
+                content = await factory()
+            except BaseException:
+                stats["rebuild_failures"] += 1
+                raise
+            finally:
+                rebuild_ms = (monotonic() - started) * 1000
+                stats["rebuilds"] += 1
+                stats["rebuild_ms"] += int(rebuild_ms)
+            entry_tags = tuple(tags(content) if callable(tags) else tags)
+            payload = EncodedPayload.from_content(content)
+        if generation != self._generation:
+            return payload, rebuild_ms
+
+        self.set(
+            key,
+            payload,
+            ttl_seconds,
+            tags=entry_tags,
+            stale_seconds=stale_seconds,
+            stale_if_error_seconds=stale_if_error_seconds,
+        )
+        if self.shared and shared_hit is None:
+            await self._shared_call(self.shared.set, key, _key_prefix(key), payload, ttl_seconds, entry_tags)
+        return payload, rebuild_ms
+
+    @staticmethod
+    async def _shared_call(fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a shared-tier operation off the event loop; failures degrade to a local-only cache."""
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except sqlite3.Error as exc:
+            print(f"Cache: shared tier unavailable: {exc}")
             return None
 
-        return value
+    def _fill_done(self, key: Hashable, fill: asyncio.Future) -> None:
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] is fill:
+            del self._inflight[key]
+        # Retrieve the exception so background refreshes nobody awaits
+        # don't log "exception was never retrieved".
+        if not fill.cancelled() and fill.exception() is not None:
+            exc = fill.exception()
+            if not isinstance(exc, HTTPException):
+                print(f"Cache: rebuild of {key!r} failed: {exc}")
+
+    def clear_prefix(self, *prefixes: str) -> int:
+        """Drop every entry whose key starts with one of ``prefixes``. Returns how many were local."""
+        removed = self._drop_indexed(self._by_prefix, prefixes)
+        self._publish("prefix", prefixes)
+        return removed
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry tagged with one of ``tags``. Returns how many were local."""
+        removed = self._drop_indexed(self._by_tag, tags)
+        self._publish("tag", tags)
+        return removed
+
+    def _drop_indexed(self, index: dict[str, set[Hashable]], names: Iterable[str]) -> int:
+        self._generation += 1
+        removed = 0
+        for name in names:
+            for key in list(index.get(name, ())):
+                self._remove(key)
+                removed += 1
+        for listener in self._invalidation_listeners:
+            listener()
+        return removed
+
+    def on_invalidate(self, listener: Callable[[], None]) -> None:
+        """Call ``listener()`` after every local or broadcast invalidation."""
+        self._invalidation_listeners.append(listener)
+
+    def _publish(self, kind: str, names: Iterable[str]) -> None:
+        # Synchronous on purpose: the shared copy must be gone before the
+        # write that triggered the invalidation returns to its caller.
+        if not self.shared:
+            return
+        try:
+            self.shared.publish(kind, names)
+        except sqlite3.Error as exc:
+            print(f"Cache: failed to broadcast invalidation: {exc}")
+
+    def on_broadcast(self, kind: str, handler: Callable[[str], None]) -> None:
+        """Call ``handler(name)`` for ``kind`` events broadcast by other workers."""
+        self._broadcast_handlers[kind] = handler
+
+    def broadcast(self, kind: str, *names: str) -> None:
+        """Send a custom event to the other workers through the shared tier."""
+        self._publish(kind, names)
+
+    async def _sync_forever(self, interval_seconds: float) -> None:
+        polls = 0
+        while True:
+            await asyncio.sleep(interval_seconds)
+            events = await self._shared_call(self.shared.poll) or []
+            for kind, name in events:
+                if kind == "prefix":
+                    self._drop_indexed(self._by_prefix, (name,))
+                elif kind == "tag":
+                    self._drop_indexed(self._by_tag, (name,))
+                elif kind in self._broadcast_handlers:
+                    self._broadcast_handlers[kind](name)
+            polls += 1
+            if polls % 1000 == 0:
+                await self._shared_call(self.shared.prune)
+
+    def start_shared_sync(self, interval_seconds: float) -> None:
+        """Start applying invalidations broadcast by other workers."""
+        if self.shared and (self._shared_sync is None or self._shared_sync.done()):
+            self._shared_sync = asyncio.create_task(self._sync_forever(interval_seconds))
+
+    def sweep_expired(self) -> int:
+        """Drop every expired entry. Returns how many were removed."""
+        now = monotonic()
+        expired = [key for key, entry in self._items.items() if entry.drop_at <= now]
+        for key in expired:
+            self._remove(key, "expirations")
+        return len(expired)
+
+    def stats(self) -> dict:
+        """Size and counter snapshot, overall and per key prefix."""
+        return {
+            "entries": len(self._items),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "prefixes": {prefix: dict(values) for prefix, values in self._stats.items()},
+        }
+
+    async def _sweep_forever(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.sweep_expired()
 
-    def set(self, key: Hashable, value: Any, ttl_seconds: int) -> None:
-        self._items[key] = (monotonic() + ttl_seconds, value)
+    def start_sweeper(self, interval_seconds: float) -> None:
+        """Start the background expiry sweep on the running event loop."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever(interval_seconds))
 
-    def clear_prefix(self, prefix: str) -> None:
-        for key in list(self._items):
-            if isinstance(key, tuple) and key and key[0] == prefix:
-                self._items.pop(key, None)
+    async def stop_sweeper(self) -> None:
+        """Stop the expiry sweep and the shared-tier invalidation listener."""
+        for task in (self._sweeper, self._shared_sync):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._sweeper = None
+        self._shared_sync = None
 
 
-response_cache = TTLCache()
+response_cache = TTLCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+    fill_timeout_seconds=settings.response_cache_fill_timeout_seconds,
+    stale_if_error_seconds=settings.response_cache_stale_if_error_seconds,
+    shared=SharedCacheTier(settings.response_cache_shared_path) if settings.response_cache_shared_path else None,
+)
@@ -0,0 +1,98 @@
+"""
+Background warming of the hottest public cache keys.
+
+Routers register warm targets next to the routes they serve, so a target
+fills exactly the key its route reads. The warmer runs them once at
+startup and again, debounced, after invalidations, so visitors rarely
+land on a cold miss after a deploy or a catalog write.
+"""
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable
+
+from app.config import settings
+from app.core.cache import TTLCache, response_cache
+
+
+class CacheWarmer:
+    """Runs registered warm targets at startup and after invalidations."""
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        debounce_seconds: float = 2.0,
+        max_delay_seconds: float = 30.0,
+        concurrency: int = 3,
+    ) -> None:
+        self.cache = cache
+        self.debounce_seconds = debounce_seconds
+        # A steady stream of writes (e.g. a bulk upload) must not postpone
+        # warming forever.
+        self.max_delay_seconds = max_delay_seconds
+        self.concurrency = concurrency
+        self._targets: list[tuple[str, Callable[[], Awaitable[object]]]] = []
+        self._task: asyncio.Task | None = None
+        self._requested_at = 0.0
+        self._started = False
+
+    def register(self, name: str, target: Callable[[], Awaitable[object]]) -> None:
+        """Add a coroutine function that fills one or more cache keys."""
+        self._targets.append((name, target))
+
+    def start(self) -> None:
+        """Warm now and re-warm after every invalidation from here on."""
+        if not self._started:
+            self._started = True
+            self.cache.on_invalidate(self.schedule)
+        self.schedule(delay=False)
+
+    async def stop(self) -> None:
+        self._started = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self, delay: bool = True) -> None:
+        """Request a warm run; bursts of requests collapse into one run."""
+        if not self._started:
+            return
+        self._requested_at = 0.0 if not delay else monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            first_request = monotonic()
+            while True:
+                wait = self._requested_at + self.debounce_seconds - monotonic()
+                if wait <= 0 or monotonic() - first_request >= self.max_delay_seconds:
+                    break
+                await asyncio.sleep(wait)
+            started = monotonic()
+            await self.warm()
+            # Invalidated again while warming: what was just built may
+            # already be gone, so go around once more.
+            if self._requested_at < started:
+                return
+
+    async def warm(self) -> None:
+        """Run every target once, a few at a time; failures are only logged."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(name: str, target: Callable[[], Awaitable[object]]) -> None:
+            async with semaphore:
+                try:
+                    await target()
+                except Exception as exc:
+                    print(f"Cache warmer: {name} failed: {exc}")
+
+        started = monotonic()
+        await asyncio.gather(*(run(name, target) for name, target in self._targets))
+        print(f"Cache warmer: warmed {len(self._targets)} targets in {monotonic() - started:.2f}s")
+
+
+cache_warmer = CacheWarmer(response_cache, debounce_seconds=settings.response_cache_warm_debounce_seconds)
@@ -0,0 +1,136 @@
+"""
+Declarative caching for public read-only endpoints.
+
+    @router.get("/featured", response_model=list[ProductListRead])
+    @cached_endpoint("products_featured", ttl_seconds=120, stale_seconds=30)
+    async def get_featured_products(session: AsyncSession, limit: int = Query(10, ge=1, le=200)) -> list:
+        ...
+
+The decorated function is the builder: it receives a DB session of its own
+(not the request's, since cache fills outlive the request that triggered
+them) plus the validated parameters, and returns JSON-safe content. The
+decorator derives the cache key from the prefix and the parameter values,
+applies the TTL, stale window and tags, answers conditional GETs from the
+catalog version and sets matching ``Cache-Control`` headers. Hits, misses
+and rebuild latency are tracked per prefix in ``response_cache.stats()``
+and reported per response in a ``Server-Timing`` header.
+"""
+import enum
+import functools
+import inspect
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+from fastapi import Request
+from pydantic.fields import FieldInfo
+
+from app.core.cache import CacheTrace, Tags, response_cache
+from app.core.catalog_version import catalog_response
+from app.core.encoded_response import EncodedPayload
+from app.database import run_in_session
+
+
+def _key_part(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, list):
+        return tuple(_key_part(v) for v in value)
+    return value
+
+
+def _default_value(default: Any) -> Any:
+    # Query(...)/Path(...) wrap the real default.
+    if isinstance(default, FieldInfo):
+        return default.get_default(call_default_factory=True)
+    return None if default is inspect.Parameter.empty else default
+
+
+def cache_control_header(ttl_seconds: int, stale_seconds: int = 0) -> str:
+    header = f"public, max-age={ttl_seconds}"
+    if stale_seconds:
+        header += f", stale-while-revalidate={stale_seconds}"
+    return header
+
+
+def server_timing(trace: CacheTrace) -> str:
+    """``Server-Timing`` value: how the cache answered, plus the rebuild time on a miss."""
+    header = f'cache;desc="{trace.outcome}"'
+    if trace.rebuild_ms is not None:
+        header += f", db;dur={trace.rebuild_ms:.1f}"
+    return header
+
+
+def cached_endpoint(
+    prefix: str,
+    *,
+    ttl_seconds: int,
+    stale_seconds: int = 0,
+    tags: Tags = (),
+    conditional: bool = True,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Turn a ``builder(session, **params)`` into a cached FastAPI endpoint.
+
+    ``tags`` may be a callable deriving tags from the built content.
+    ``conditional`` enables ETag/304 handling from the catalog version; only
+    turn it off for payloads that change without a catalog write.
+
+    The endpoint gains a ``fill(**params)`` attribute returning the cached
+    payload for the given parameters (defaults for the rest), used by the
+    cache warmer to fill exactly the keys the route reads.
+    """
+    cache_control = cache_control_header(ttl_seconds, stale_seconds)
+
+    def decorator(builder: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(builder)
+        params = list(signature.parameters.values())
+        if not params or params[0].name != "session":
+            raise TypeError(f"{builder.__name__}: first parameter must be 'session'")
+        params = params[1:]
+        reserved = [p.name for p in params if p.name in ("request", "trace")]
+        if reserved:
+            raise TypeError(f"{builder.__name__}: '{reserved[0]}' is reserved by cached_endpoint")
+        defaults = {p.name: _default_value(p.default) for p in params}
+
+        def fill(trace: CacheTrace | None = None, **values: Any) -> Awaitable[EncodedPayload]:
+            values = {**defaults, **values}
+            key = (prefix, *(_key_part(values[p.name]) for p in params))
+            return response_cache.get_or_set(
+                key,
+                lambda: run_in_session(builder, **values),
+                ttl_seconds=ttl_seconds,
+                stale_seconds=stale_seconds,
+                tags=tags,
+                trace=trace,
+            )
+
+        @functools.wraps(builder)
+        async def endpoint(request: Request, **values: Any):
+            trace = CacheTrace()
+            if conditional:
+                response = await catalog_response(request, lambda: fill(trace, **values), cache_control)
+            else:
+                payload = await fill(trace, **values)
+                response = payload.to_response(request, headers={"Cache-Control": cache_control})
+            if response.status_code == 304:
+                response_cache.record(prefix, "not_modified")
+                trace.outcome = "not-modified"
+            response.headers["Server-Timing"] = server_timing(trace)
+            return response
+
+        # FastAPI reads the parameters from here: the request plus the
+        # builder's own parameters, minus the session.
+        endpoint.__signature__ = signature.replace(
+            parameters=[
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+                *(p.replace(kind=inspect.Parameter.KEYWORD_ONLY) for p in params),
+            ],
+            return_annotation=inspect.Signature.empty,
+        )
+        endpoint.fill = fill
+        endpoint.cache_prefix = prefix
+        return endpoint
+
+    return decorator
@@ -0,0 +1,106 @@
+"""
+Catalog version counter for conditional GETs on the public catalog API.
+
+Every catalog write bumps the version; the public routes derive their
+``ETag``/``Last-Modified`` from it, so an ``If-None-Match`` revalidation is
+answered with 304 before the cache, the database or the serializer is
+touched.
+
+The version is a millisecond timestamp rather than a plain counter, so it
+keeps increasing across restarts and a client can never revalidate against
+a value from a previous process. Workers sharing a cache tier exchange
+their versions through it and converge on the highest one.
+"""
+import time
+from email.utils import formatdate
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from app.core.cache import response_cache
+from app.core.encoded_response import EncodedPayload
+
+BROADCAST_KIND = "catalog_version"
+CATEGORY_BROADCAST_KIND = "category_version"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class CatalogVersion:
+    """Monotonic catalog version, bumped on writes and synced across workers."""
+
+    def __init__(self, kind: str = BROADCAST_KIND) -> None:
+        self.kind = kind
+        self.value = _now_ms()
+
+    def bump(self) -> int:
+        """Advance the version after a catalog write and tell the other workers."""
+        self.value = max(_now_ms(), self.value + 1)
+        response_cache.broadcast(self.kind, str(self.value))
+        return self.value
+
+    def observe(self, value: str | int) -> None:
+        """Adopt a version seen on another worker if it is newer."""
+        try:
+            self.value = max(self.value, int(value))
+        except ValueError:
+            pass
+
+    def announce(self) -> None:
+        """Publish this worker's version so freshly started workers agree."""
+        response_cache.broadcast(self.kind, str(self.value))
+
+
+catalog_version = CatalogVersion()
+response_cache.on_broadcast(BROADCAST_KIND, catalog_version.observe)
+# Narrower version for views built only from categories (the category
+# registry): bumped by category writes and by product writes, which can
+# move category cover images, but not by orders, promos or banners.
+category_version = CatalogVersion(CATEGORY_BROADCAST_KIND)
+response_cache.on_broadcast(CATEGORY_BROADCAST_KIND, category_version.observe)
+
+
+def _etag(version: int) -> str:
+    # Weak: the same version is served gzip, brotli or identity encoded.
+    return f'W/"catalog-{version}"'
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore the W/ prefix on both sides.
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+async def catalog_response(
+    request: Request,
+    build: Callable[[], Awaitable[EncodedPayload]],
+    cache_control: str,
+) -> Response:
+    """
+    Serve a public catalog payload with version validators.
+
+    The version is read before ``build`` runs: a write landing while the
+    payload is built only makes the returned ETag conservative, never newer
+    than the content.
+    """
+    version = catalog_version.value
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": _etag(version),
+        "Last-Modified": formatdate(version / 1000, usegmt=True),
+    }
+    if _is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers={**headers, "Vary": "Accept-Encoding"})
+
+    payload = await build()
+    return payload.to_response(request, headers=headers)
@@ -0,0 +1,98 @@
+"""
+Pre-encoded JSON payloads for cached public responses.
+
+The body is serialized, compressed and hashed once when a cache entry is
+filled; a cache hit only picks the variant matching ``Accept-Encoding``.
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Same threshold as the app's GZipMiddleware; smaller bodies aren't worth it.
+MIN_COMPRESS_BYTES = 1024
+
+
+def _accepted_encodings(request: Request) -> set[str]:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            accepted.add(name)
+    return accepted
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    """A JSON body with its gzip/brotli variants and a strong ETag."""
+
+    body: bytes
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+    etag: str = ""
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "EncodedPayload":
+        compressible = len(body) >= MIN_COMPRESS_BYTES
+        return cls(
+            body=body,
+            gzip=gzip.compress(body, compresslevel=6) if compressible else None,
+            br=brotli.compress(body, quality=5) if compressible and brotli else None,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+        )
+
+    @classmethod
+    def from_content(cls, content: Any) -> "EncodedPayload":
+        # Matches starlette's JSONResponse.render byte-for-byte.
+        body = json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return cls.from_body(body)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzip or b"") + len(self.br or b"")
+
+    def to_response(self, request: Request, headers: Optional[dict[str, str]] = None) -> Response:
+        """
+        Build a response, choosing the best precompressed variant the client accepts.
+
+        An ``ETag`` passed in ``headers`` (e.g. a catalog version) takes
+        precedence over the content hash.
+        """
+        accepted = _accepted_encodings(request)
+        response_headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+        if self.br is not None and "br" in accepted:
+            content, encoding = self.br, "br"
+        elif self.gzip is not None and ("gzip" in accepted or "*" in accepted):
+            content, encoding = self.gzip, "gzip"
+        else:
+            content, encoding = self.body, None
+
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+            # A strong ETag must differ between encodings of the same body.
+            response_headers.setdefault("ETag", f'"{self.etag}-{encoding}"')
+        else:
+            response_headers.setdefault("ETag", f'"{self.etag}"')
+        return Response(content=content, media_type="application/json", headers=response_headers)
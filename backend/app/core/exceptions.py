@@ -98,3 +98,13 @@ class InsufficientStockException(BadRequestException):
     
     def __init__(self, product_name: str):
         super().__init__(detail=f"Insufficient stock for product: {product_name}")
+
+
+class ServiceUnavailableException(PranjayException):
+    """Service temporarily unavailable exception."""
+    
+    def __init__(self, detail: str = "Service temporarily unavailable. Please try again."):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail
+        )
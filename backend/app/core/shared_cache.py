@@ -0,0 +1,191 @@
+"""
+Host-wide second cache tier shared by all workers, backed by a SQLite file.
+
+Workers read through it on local misses and write back what they build, so
+a payload is computed once per host instead of once per worker. Every
+invalidation is appended to an event log that each worker polls, which
+keeps the per-worker tiers in step within a few milliseconds.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Hashable, Iterable
+
+from app.core.encoded_response import EncodedPayload
+
+# Invalidation events older than this are pruned; workers that fall further
+# behind (e.g. a stalled process) simply start from the newest event.
+EVENT_RETENTION_SECONDS = 60
+
+# Bump when the table layout changes; the shared file is only a cache, so
+# an outdated one is simply dropped and recreated.
+SCHEMA_VERSION = 2
+
+
+def encode_key(key: Hashable) -> str:
+    parts = list(key) if isinstance(key, tuple) else [key]
+    return json.dumps(parts, default=str, separators=(",", ":"))
+
+
+class SharedCacheTier:
+    """SQLite-backed cache and invalidation log shared across processes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.origin = f"{os.getpid()}-{id(self)}"
+        self._local = threading.local()
+        self._last_event_id = 0
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.executescript(
+                f"""
+                BEGIN IMMEDIATE;
+                DROP TABLE IF EXISTS cache_entries;
+                DROP TABLE IF EXISTS cache_entry_tags;
+                PRAGMA user_version = {SCHEMA_VERSION};
+                COMMIT;
+                """
+            )
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                prefix TEXT NOT NULL,
+                body BLOB NOT NULL,
+                gzip BLOB,
+                br BLOB,
+                etag TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_prefix ON cache_entries (prefix);
+            CREATE TABLE IF NOT EXISTS cache_entry_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            );
+            CREATE TABLE IF NOT EXISTS cache_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM cache_events").fetchone()
+        self._last_event_id = row[0]
+
+    def get(self, key: Hashable) -> tuple[EncodedPayload, float, tuple[str, ...]] | None:
+        """Return ``(payload, remaining_ttl, tags)`` for a fresh shared entry."""
+        conn = self._connect()
+        encoded = encode_key(key)
+        row = conn.execute(
+            "SELECT body, gzip, br, etag, expires_at FROM cache_entries WHERE key = ?",
+            (encoded,),
+        ).fetchone()
+        if row is None:
+            return None
+        remaining = row[4] - time.time()
+        if remaining <= 0:
+            return None
+        tags = tuple(
+            tag for (tag,) in conn.execute("SELECT tag FROM cache_entry_tags WHERE key = ?", (encoded,))
+        )
+        return EncodedPayload(body=row[0], gzip=row[1], br=row[2], etag=row[3]), remaining, tags
+
+    def set(
+        self,
+        key: Hashable,
+        prefix: str,
+        payload: EncodedPayload,
+        ttl_seconds: float,
+        tags: Iterable[str],
+    ) -> None:
+        encoded = encode_key(key)
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, prefix, body, gzip, br, etag, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    encoded,
+                    prefix,
+                    payload.body,
+                    payload.gzip,
+                    payload.br,
+                    payload.etag,
+                    time.time() + ttl_seconds,
+                ),
+            )
+            conn.execute("DELETE FROM cache_entry_tags WHERE key = ?", (encoded,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_entry_tags (tag, key) VALUES (?, ?)",
+                [(tag, encoded) for tag in tags],
+            )
+
+    def publish(self, kind: str, names: Iterable[str]) -> None:
+        """
+        Broadcast an event to the other workers.
+
+        ``prefix`` and ``tag`` events also delete the matching shared entries;
+        any other kind is only relayed.
+        """
+        names = list(names)
+        if not names:
+            return
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            keys_sql = {
+                "prefix": "SELECT key FROM cache_entries WHERE prefix = ?",
+                "tag": "SELECT key FROM cache_entry_tags WHERE tag = ?",
+            }.get(kind)
+            if keys_sql:
+                keys = [(row[0],) for name in names for row in conn.execute(keys_sql, (name,))]
+                conn.executemany("DELETE FROM cache_entry_tags WHERE key = ?", keys)
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", keys)
+            conn.executemany(
+                "INSERT INTO cache_events (kind, name, origin, created_at) VALUES (?, ?, ?, ?)",
+                [(kind, name, self.origin, now) for name in names],
+            )
+
+    def poll(self) -> list[tuple[str, str]]:
+        """Return events published by other workers since the last poll."""
+        rows = self._connect().execute(
+            "SELECT id, kind, name, origin FROM cache_events WHERE id > ? ORDER BY id",
+            (self._last_event_id,),
+        ).fetchall()
+        if not rows:
+            return []
+        self._last_event_id = rows[-1][0]
+        return [(kind, name) for _, kind, name, origin in rows if origin != self.origin]
+
+    def prune(self) -> None:
+        """Drop expired shared entries and old invalidation events."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM cache_entry_tags WHERE key IN "
+                "(SELECT key FROM cache_entries WHERE expires_at <= ?)",
+                (now,),
+            )
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM cache_events WHERE created_at <= ?", (now - EVENT_RETENTION_SECONDS,))
@@ -1,8 +1,9 @@
 """
 Pranjay Backend - Database Configuration
 """
+import asyncio
 import os
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable, TypeVar
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -79,6 +80,8 @@ async_session_maker = sessionmaker(
 # Alias for seed scripts
 async_session = async_session_maker
 
+T = TypeVar("T")
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session."""
@@ -89,6 +92,36 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def run_in_session(fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(session, *args, **kwargs)`` in its own session, independent of any request."""
+    async with async_session_maker() as session:
+        return await fn(session, *args, **kwargs)
+
+
+async def warm_pool(connections: int = 5) -> None:
+    """Open pooled connections up front so the first requests skip the TLS/auth handshake."""
+    if is_serverless:
+        return
+    import sqlalchemy as sa
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(sa.text("SELECT 1"))
+
+    # Concurrent checkouts force distinct connections; they stay in the pool afterwards.
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(ping() for _ in range(connections)), return_exceptions=True),
+            timeout=10.0,
+        )
+    except asyncio.TimeoutError:
+        print("Database: Pool warm-up timed out. Skipping...")
+        return
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        print(f"Database: Pool warm-up failed for {len(failures)}/{connections} connections: {failures[0]}")
+
+
 async def init_db() -> None:
     """Initialize database tables with retries."""
     import asyncio
@@ -135,9 +168,14 @@ async def run_startup_migrations() -> None:
                     await conn.execute(sa.text("ALTER TABLE categories ADD COLUMN seller_name VARCHAR(255) DEFAULT 'Pranjay';"))
                 except Exception:
                     pass
+                try:
+                    await conn.execute(sa.text("ALTER TABLE categories ADD COLUMN fallback_image_url VARCHAR(500);"))
+                except Exception:
+                    pass
             else:
                 await conn.execute(sa.text("ALTER TABLE categories ADD COLUMN IF NOT EXISTS seller_id UUID;"))
                 await conn.execute(sa.text("ALTER TABLE categories ADD COLUMN IF NOT EXISTS seller_name VARCHAR(255) DEFAULT 'Pranjay';"))
+                await conn.execute(sa.text("ALTER TABLE categories ADD COLUMN IF NOT EXISTS fallback_image_url VARCHAR(500);"))
                 try:
                     await conn.execute(sa.text(
                         "ALTER TABLE categories ADD CONSTRAINT fk_categories_seller_id_users "
@@ -149,6 +187,11 @@ async def run_startup_migrations() -> None:
         print("Database: Running product schema migrations...")
         async with engine.connect() as conn:
             conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            # units_sold only needs counting from orders when this run adds the column.
+            product_columns = await conn.run_sync(
+                lambda sync_conn: {column["name"] for column in sa.inspect(sync_conn).get_columns("products")}
+            )
+            units_sold_added = "units_sold" not in product_columns
             if "sqlite" in db_url:
                 try:
                     await conn.execute(sa.text("ALTER TABLE products ADD COLUMN gst_percentage INTEGER DEFAULT 18;"))
@@ -166,11 +209,24 @@ async def run_startup_migrations() -> None:
                     await conn.execute(sa.text("UPDATE products SET category_ids = '[]' WHERE category_ids IS NULL;"))
                 except Exception:
                     pass
+                for sql in [
+                    "ALTER TABLE products ADD COLUMN discount_percent NUMERIC(5, 2) DEFAULT 0 NOT NULL;",
+                    "ALTER TABLE products ADD COLUMN primary_image_url VARCHAR(500);",
+                    "ALTER TABLE products ADD COLUMN units_sold INTEGER DEFAULT 0 NOT NULL;",
+                    "CREATE INDEX IF NOT EXISTS ix_products_discount_percent ON products (discount_percent);",
+                ]:
+                    try:
+                        await conn.execute(sa.text(sql))
+                    except Exception:
+                        pass
             else:
                 await conn.execute(sa.text("ALTER TABLE products ADD COLUMN IF NOT EXISTS gst_percentage INTEGER DEFAULT 18;"))
                 await conn.execute(sa.text("ALTER TABLE products ADD COLUMN IF NOT EXISTS parent_id UUID REFERENCES products(id);"))
                 await conn.execute(sa.text("ALTER TABLE products ADD COLUMN IF NOT EXISTS category_ids JSONB DEFAULT '[]'::jsonb;"))
                 await conn.execute(sa.text("UPDATE products SET category_ids = '[]'::jsonb WHERE category_ids IS NULL;"))
+                await conn.execute(sa.text("ALTER TABLE products ADD COLUMN IF NOT EXISTS discount_percent NUMERIC(5, 2) NOT NULL DEFAULT 0;"))
+                await conn.execute(sa.text("ALTER TABLE products ADD COLUMN IF NOT EXISTS primary_image_url VARCHAR(500);"))
+                await conn.execute(sa.text("ALTER TABLE products ADD COLUMN IF NOT EXISTS units_sold INTEGER NOT NULL DEFAULT 0;"))
 
         # 4. Performance indexes — idempotent (CREATE INDEX IF NOT EXISTS)
         print("Database: Running seller bank detail schema migrations...")
@@ -239,6 +295,43 @@ async def run_startup_migrations() -> None:
                 await conn.execute(sa.text("ALTER TABLE order_items ADD COLUMN IF NOT EXISTS cancelled_at TIMESTAMP;"))
                 await conn.execute(sa.text("ALTER TABLE order_items ADD COLUMN IF NOT EXISTS cancellation_reason VARCHAR(500);"))
 
+        print("Database: Backfilling product categories...")
+        async with engine.begin() as conn:
+            from app.services.product_categories import backfill_product_categories
+            added = await backfill_product_categories(conn)
+            if added:
+                print(f"Database: Added {added} product category memberships.")
+
+        print("Database: Backfilling product listing fields...")
+        async with engine.begin() as conn:
+            from app.services.product_listing_fields import backfill_listing_fields
+            updated = await backfill_listing_fields(conn, units_sold=units_sold_added)
+            if updated:
+                print(f"Database: Updated listing fields of {updated} products.")
+
+        print("Database: Rebuilding brand stats...")
+        async with engine.begin() as conn:
+            from app.services.brand_stats import refresh_brand_stats
+            await refresh_brand_stats(conn)
+
+        print("Database: Refreshing category cover images...")
+        async with engine.begin() as conn:
+            from app.services.category_covers import refresh_category_covers
+            await refresh_category_covers(conn)
+
+        print("Database: Rebuilding category closure...")
+        async with engine.begin() as conn:
+            from app.services.category_closure import rebuild_category_closure
+            await rebuild_category_closure(conn)
+
+        print("Database: Ensuring product full-text and fuzzy search...")
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            from app.services.product_search import ensure_search_schema
+            from app.services.product_fuzzy import ensure_fuzzy_schema
+            await ensure_search_schema(conn)
+            await ensure_fuzzy_schema(conn)
+
         # 5. Performance indexes — idempotent (CREATE INDEX IF NOT EXISTS)
         if "postgresql" in db_url:
             print("Database: Ensuring performance indexes...")
@@ -256,6 +349,14 @@ async def run_startup_migrations() -> None:
                     "CREATE INDEX IF NOT EXISTS idx_products_active_brand_created_at ON products (is_active, brand_id, created_at DESC);",
                     "CREATE INDEX IF NOT EXISTS idx_products_active_category_created_at ON products (is_active, category_id, created_at DESC);",
                     "CREATE INDEX IF NOT EXISTS idx_products_active_price ON products (is_active, selling_price);",
+                    "CREATE INDEX IF NOT EXISTS ix_products_updated_at ON products (updated_at);",
+                    "CREATE INDEX IF NOT EXISTS ix_products_discount_percent ON products (discount_percent);",
+                    # Public sort orderings (app.services.product_sort), each ending in id
+                    "CREATE INDEX IF NOT EXISTS idx_products_active_created_id ON products (is_active, created_at DESC, id DESC);",
+                    "CREATE INDEX IF NOT EXISTS idx_products_active_price_id ON products (is_active, selling_price, id);",
+                    "CREATE INDEX IF NOT EXISTS idx_products_active_discount_id ON products (is_active, discount_percent DESC, id DESC);",
+                    "CREATE INDEX IF NOT EXISTS idx_products_active_name_id ON products (is_active, name, id);",
+                    "CREATE INDEX IF NOT EXISTS idx_products_active_units_sold_id ON products (is_active, units_sold DESC, id DESC);",
                     # Public homepage/filter lookups
                     "CREATE INDEX IF NOT EXISTS idx_categories_active_sort ON categories (is_active, sort_order, name);",
                     "CREATE INDEX IF NOT EXISTS idx_brands_active_name ON brands (is_active, name);",
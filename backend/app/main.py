@@ -12,7 +12,10 @@ from fastapi.staticfiles import StaticFiles
 from starlette.middleware.gzip import GZipMiddleware
 
 from app.config import settings
-from app.database import close_db, init_db, run_startup_migrations
+from app.core.cache import response_cache
+from app.core.cache_warmer import cache_warmer
+from app.core.catalog_version import catalog_version, category_version
+from app.database import close_db, init_db, run_startup_migrations, warm_pool
 from app.routers import auth, banners, cart, categories, checkout, home, orders, products, users, wishlist
 from app.routers import invoices, promo_codes, contact, checkout_prep, documents
 # from app.routers.admin import banners as admin_banners, bulk_upload, dashboard, migrate_images
@@ -23,14 +26,24 @@ from app.routers.admin import products as admin_products
 from app.routers.admin import users as admin_users
 from app.routers.admin import categories as admin_categories
 from app.routers.admin import brands as admin_brands
+from app.routers.admin import cache as admin_cache
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
     await run_startup_migrations()
+    response_cache.start_sweeper(settings.response_cache_sweep_seconds)
+    response_cache.start_shared_sync(settings.response_cache_broadcast_ms / 1000)
+    catalog_version.announce()
+    category_version.announce()
+    if settings.response_cache_warm_enabled:
+        await warm_pool()
+        cache_warmer.start()
     yield
     # Shutdown
+    await cache_warmer.stop()
+    await response_cache.stop_sweeper()
     await close_db()
 
 
@@ -126,6 +139,9 @@ app.include_router(
 app.include_router(
     admin_banners.router, prefix=f"{API_PREFIX}/admin/banners", tags=["Admin - Banners"]
 )
+app.include_router(
+    admin_cache.router, prefix=f"{API_PREFIX}/admin/cache", tags=["Admin - Cache"]
+)
 # app.include_router(
 #     migrate_images.router, prefix=f"{API_PREFIX}/admin/migrate", tags=["Admin - Migration"]
 # )
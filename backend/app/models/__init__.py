@@ -1,9 +1,9 @@
 """Pranjay Backend Models Package"""
 from app.models.user import User, UserType, UserRole
 from app.models.otp import OTPCode
-from app.models.category import Category
-from app.models.brand import Brand
-from app.models.product import Product, ProductImage
+from app.models.category import Category, CategoryClosure
+from app.models.brand import Brand, BrandStats
+from app.models.product import Product, ProductCategory, ProductImage
 from app.models.address import Address
 from app.models.cart import CartItem
 from app.models.wishlist import WishlistItem
@@ -17,9 +17,12 @@ __all__ = [
     "UserRole",
     "OTPCode",
     "Category",
+    "CategoryClosure",
     "Brand",
+    "BrandStats",
     "Product",
     "ProductImage",
+    "ProductCategory",
     "Address",
     "CartItem",
     "WishlistItem",
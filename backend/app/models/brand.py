@@ -2,6 +2,7 @@
 Brand Model
 """
 from datetime import datetime
+from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
@@ -31,6 +32,22 @@ class Brand(BrandBase, table=True):
     products: list["Product"] = Relationship(back_populates="brand")
 
 
+class BrandStats(SQLModel, table=True):
+    """
+    Rollup of a brand's active products, kept by ``app.services.brand_stats``
+    so brand lists need no aggregate over the catalog. Brands without
+    active products have no row.
+    """
+    __tablename__ = "brand_stats"
+
+    brand_id: UUID = Field(foreign_key="brands.id", primary_key=True)
+    product_count: int = Field(default=0)
+    max_discount: Decimal = Field(default=Decimal("0"), max_digits=5, decimal_places=2, index=True)
+    min_price: Decimal = Field(default=Decimal("0"), max_digits=10, decimal_places=2)
+    max_price: Decimal = Field(default=Decimal("0"), max_digits=10, decimal_places=2)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class BrandCreate(SQLModel):
     """Schema for creating brand."""
     name: str
@@ -30,6 +30,8 @@ class Category(CategoryBase, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     parent_id: Optional[UUID] = Field(default=None, foreign_key="categories.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Shown when image_url is empty; kept by app.services.category_covers
+    fallback_image_url: Optional[str] = Field(default=None, max_length=500)
     
     # Self-referential relationship for hierarchy
     parent: Optional["Category"] = Relationship(
@@ -40,6 +42,19 @@ class Category(CategoryBase, table=True):
     products: list["Product"] = Relationship(back_populates="category")
 
 
+class CategoryClosure(SQLModel, table=True):
+    """
+    One row per (ancestor, descendant) pair of the category tree, including
+    each category paired with itself at depth 0, so a whole subtree is a
+    single indexed lookup on ``ancestor_id``.
+    """
+    __tablename__ = "category_closure"
+
+    ancestor_id: UUID = Field(foreign_key="categories.id", primary_key=True)
+    descendant_id: UUID = Field(foreign_key="categories.id", primary_key=True)
+    depth: int = Field(default=0)
+
+
 class CategoryCreate(SQLModel):
     """Schema for creating category."""
     name: str
@@ -75,3 +90,15 @@ class CategoryRead(CategoryBase):
 class CategoryWithChildren(CategoryRead):
     """Schema for category with children."""
     children: list["CategoryRead"] = []
+
+
+class CategoryBreadcrumb(SQLModel):
+    """One step of a category's path from its root."""
+    id: UUID
+    name: str
+    slug: str
+
+
+class CategoryDetail(CategoryWithChildren):
+    """Schema for a category page: children plus its root-first breadcrumb path."""
+    breadcrumbs: list[CategoryBreadcrumb] = []
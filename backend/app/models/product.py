@@ -6,6 +6,7 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel, Column, JSON
 
 if TYPE_CHECKING:
@@ -53,7 +54,17 @@ class Product(ProductBase, table=True):
     # Multi-category support: JSON array of category UUIDs
     category_ids: list = Field(default=[], sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped on every ORM update; drives delta sync of the client search index
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
+    # Stored for listing queries; maintained by app.services.product_listing_fields
+    discount_percent: Decimal = Field(default=Decimal("0"), max_digits=5, decimal_places=2, index=True)
+    primary_image_url: Optional[str] = Field(default=None, max_length=500)
+    # Units on orders that are not cancelled; drives the "popularity" sort
+    units_sold: int = Field(default=0)
     
     # Relationships
     category: Optional["Category"] = Relationship(back_populates="products")
@@ -83,6 +94,21 @@ class ProductImage(ProductImageBase, table=True):
     product: "Product" = Relationship(back_populates="images")
 
 
+class ProductCategory(SQLModel, table=True):
+    """
+    Category membership of a product: its ``category_id`` plus every entry
+    of ``category_ids``, normalized so category filters are an indexed
+    semi-join instead of a substring match on the JSON column.
+    """
+    __tablename__ = "product_categories"
+    __table_args__ = (
+        Index("ix_product_categories_category_product", "category_id", "product_id"),
+    )
+
+    product_id: UUID = Field(foreign_key="products.id", primary_key=True)
+    category_id: UUID = Field(foreign_key="categories.id", primary_key=True)
+
+
 class ProductCreate(SQLModel):
     """Schema for creating product."""
     name: str
@@ -177,3 +203,34 @@ class ProductListRead(SQLModel):
     seller_id: Optional[UUID] = None
     seller_name: Optional[str] = "Pranjay"
     parent_id: Optional[UUID] = None
+
+
+class FacetValue(SQLModel):
+    """A brand or category facet entry."""
+    id: UUID
+    name: str
+    slug: str
+    count: int
+
+
+class PriceRangeFacet(SQLModel):
+    """Products priced from ``min`` up to (not including) ``max``; no ``max`` on the last bucket."""
+    min: Decimal
+    max: Optional[Decimal] = None
+    count: int
+
+
+class DiscountFacet(SQLModel):
+    """Products with at least ``min_discount`` percent off MRP."""
+    min_discount: int
+    count: int
+
+
+class ProductFacets(SQLModel):
+    """Facet counts for a listing's filter set."""
+    brands: list[FacetValue] = []
+    categories: list[FacetValue] = []
+    price_ranges: list[PriceRangeFacet] = []
+    discounts: list[DiscountFacet] = []
+    in_stock: int = 0
+    out_of_stock: int = 0
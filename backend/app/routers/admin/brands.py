@@ -5,12 +5,14 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete as sa_delete
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 
 from app.core.cache import response_cache
+from app.core.catalog_version import catalog_version
 from app.database import get_session
-from app.models.brand import Brand, BrandCreate, BrandUpdate, BrandRead
+from app.models.brand import Brand, BrandCreate, BrandStats, BrandUpdate, BrandRead
 from app.core.dependencies import get_current_admin
 
 router = APIRouter(
@@ -20,8 +22,8 @@ router = APIRouter(
 
 
 def _clear_brand_public_cache() -> None:
-    response_cache.clear_prefix("products_brands")
-    response_cache.clear_prefix("products_brands_featured")
+    response_cache.clear_prefix("products_brands", "products_brands_featured", "catalog_bootstrap")
+    catalog_version.bump()
 
 @router.get("", response_model=List[BrandRead])
 async def list_brands(
@@ -104,6 +106,7 @@ async def delete_brand(
             detail="Brand not found",
         )
         
+    await session.execute(sa_delete(BrandStats).where(BrandStats.brand_id == brand_id))
     await session.delete(brand)
     await session.commit()
     _clear_brand_public_cache()
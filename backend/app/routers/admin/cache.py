@@ -0,0 +1,98 @@
+"""
+Admin Cache Router - response cache observability and manual purges
+"""
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from app.core.cache import response_cache
+from app.core.catalog_version import catalog_version, category_version
+from app.core.dependencies import get_current_admin
+from app.core.exceptions import BadRequestException
+
+router = APIRouter(dependencies=[Depends(get_current_admin)])
+
+
+class CachePrefixStats(BaseModel):
+    """Counters for one cache key prefix (roughly one public route)."""
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    not_modified: int
+    stale_served: int
+    error_served: int
+    coalesced: int
+    shared_hits: int
+    evictions: int
+    expirations: int
+    rebuilds: int
+    rebuild_failures: int
+    mean_rebuild_ms: float
+
+
+class CacheStats(BaseModel):
+    """Response cache snapshot for the worker that served the request."""
+    entries: int
+    bytes: int
+    max_entries: int
+    max_bytes: int
+    shared_tier: bool
+    catalog_version: int
+    prefixes: dict[str, CachePrefixStats]
+
+
+class CachePurgeRequest(BaseModel):
+    prefixes: list[str] = []
+    tags: list[str] = []
+
+
+class CachePurgeResult(BaseModel):
+    removed: int
+
+
+@router.get("/stats", response_model=CacheStats)
+async def get_cache_stats():
+    """
+    Hit ratios, sizes and rebuild latency per prefix.
+    Counters are per worker and reset on restart.
+    """
+    stats = response_cache.stats()
+    prefixes = {}
+    for prefix, values in sorted(stats["prefixes"].items()):
+        lookups = values["hits"] + values["misses"]
+        prefixes[prefix] = CachePrefixStats(
+            **{name: value for name, value in values.items() if name in CachePrefixStats.model_fields},
+            hit_ratio=round(values["hits"] / lookups, 4) if lookups else 0.0,
+            mean_rebuild_ms=round(values["rebuild_ms"] / values["rebuilds"], 1) if values["rebuilds"] else 0.0,
+        )
+    return CacheStats(
+        entries=stats["entries"],
+        bytes=stats["bytes"],
+        max_entries=stats["max_entries"],
+        max_bytes=stats["max_bytes"],
+        shared_tier=response_cache.shared is not None,
+        catalog_version=catalog_version.value,
+        prefixes=prefixes,
+    )
+
+
+@router.post("/purge", response_model=CachePurgeResult)
+async def purge_cache(data: CachePurgeRequest):
+    """
+    Drop cached responses by key prefix (e.g. ``products_list``) or tag
+    (e.g. ``product:<id>``), on every worker sharing the cache tier.
+    """
+    if not data.prefixes and not data.tags:
+        raise BadRequestException("Provide at least one prefix or tag")
+
+    removed = 0
+    if data.prefixes:
+        removed += response_cache.clear_prefix(*data.prefixes)
+    if data.tags:
+        removed += response_cache.invalidate_tags(*data.tags)
+    # A manual purge usually follows an out-of-band data fix, so make
+    # clients holding an ETag fetch again too.
+    catalog_version.bump()
+    category_version.bump()
+    return CachePurgeResult(removed=removed)
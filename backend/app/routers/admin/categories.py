@@ -5,17 +5,39 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func
+from sqlalchemy import delete as sa_delete, func
 
-from app.core.cache import response_cache
+from app.core.cache import category_tag, product_tag, response_cache
+from app.core.catalog_version import catalog_version, category_version
 from app.database import get_session
-from app.models.category import Category, CategoryCreate, CategoryUpdate, CategoryRead
+from app.models.category import Category, CategoryClosure, CategoryCreate, CategoryUpdate, CategoryRead
 from app.models.user import User, UserRole
 from app.core.dependencies import get_current_admin
-from app.core.exceptions import ConflictException, NotFoundException
+from app.core.exceptions import BadRequestException, ConflictException, NotFoundException
+from app.services.category_closure import is_in_subtree, rebuild_category_closure
+from app.services.category_registry import category_registry
+from app.services.product_categories import remove_category as remove_category_from_products
 
 router = APIRouter()
 
+
+def _clear_category_public_cache(*category_ids: UUID | None) -> None:
+    """Drop cached category views plus the slug pages of the touched categories."""
+    # Subtree listings change with the tree, so product listings go too.
+    response_cache.clear_prefix(
+        "categories_list",
+        "categories_tree",
+        "home_bootstrap",
+        "catalog_bootstrap",
+        "products_list",
+        "products_count",
+        "products_facets",
+    )
+    response_cache.invalidate_tags(*(category_tag(c) for c in category_ids if c))
+    catalog_version.bump()
+    category_version.bump()
+
+
 @router.get("", response_model=list[CategoryRead])
 async def list_categories_admin(
     current_user: User = Depends(get_current_admin),
@@ -46,11 +68,13 @@ async def create_category(
     
     category = Category(**data.model_dump())
     session.add(category)
+    await session.flush()
+    await rebuild_category_closure(session)
     await session.commit()
     await session.refresh(category)
-    response_cache.clear_prefix("categories_list")
-    response_cache.clear_prefix("categories_tree")
-    response_cache.clear_prefix("categories_slug")
+    _clear_category_public_cache(category.id, category.parent_id)
+    # Swap in the new tree now; other workers rebuild on their next read.
+    await category_registry.refresh(session)
     return category
 
 @router.patch("/{category_id}", response_model=CategoryRead)
@@ -72,16 +96,23 @@ async def update_category(
         if existing.scalar_one_or_none():
             raise ConflictException("Category with this slug already exists")
             
+    previous_parent_id = category.parent_id
     update_data = data.model_dump(exclude_unset=True)
+    new_parent_id = update_data.get("parent_id")
+    if new_parent_id is not None and await is_in_subtree(session, new_parent_id, category_id):
+        raise BadRequestException("A category cannot be moved under itself or its subcategories")
+
     for field, value in update_data.items():
         setattr(category, field, value)
         
     session.add(category)
+    await session.flush()
+    if category.parent_id != previous_parent_id:
+        await rebuild_category_closure(session)
     await session.commit()
     await session.refresh(category)
-    response_cache.clear_prefix("categories_list")
-    response_cache.clear_prefix("categories_tree")
-    response_cache.clear_prefix("categories_slug")
+    _clear_category_public_cache(category.id, previous_parent_id, category.parent_id)
+    await category_registry.refresh(session)
     return category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -97,8 +128,17 @@ async def delete_category(
     if not category:
         raise NotFoundException("Category")
         
+    parent_id = category.parent_id
+    touched_products = await remove_category_from_products(session, category_id)
+    await session.execute(
+        sa_delete(CategoryClosure).where(
+            (CategoryClosure.ancestor_id == category_id) | (CategoryClosure.descendant_id == category_id)
+        )
+    )
     await session.delete(category)
+    await session.flush()
+    await rebuild_category_closure(session)
     await session.commit()
-    response_cache.clear_prefix("categories_list")
-    response_cache.clear_prefix("categories_tree")
-    response_cache.clear_prefix("categories_slug")
+    _clear_category_public_cache(category_id, parent_id)
+    response_cache.invalidate_tags(*(product_tag(product_id) for product_id in touched_products))
+    await category_registry.refresh(session)
@@ -13,6 +13,7 @@ from app.core.exceptions import ForbiddenException
 from app.database import get_session
 from app.models.product import ProductCreate, ProductRead, ProductUpdate
 from app.models.user import User
+from app.services.product_counts import CountStrategy
 from app.services.product_service import ProductService
 from app.services.storage_service import storage_service
 
@@ -22,9 +23,13 @@ router = APIRouter()
 class PaginatedProductsAdmin(BaseModel):
     """Paginated products for admin."""
     items: list[ProductRead]
-    total: int
+    # None with count=has_more
+    total: Optional[int]
     page: int
     page_size: int
+    has_more: bool = False
+    # Pass as ``cursor`` to fetch the next page without an OFFSET scan
+    next_cursor: Optional[str] = None
 
 
 class BulkDeleteProductsRequest(BaseModel):
@@ -39,6 +44,8 @@ async def list_products_admin(
     brand_id: Optional[UUID] = None,
     is_active: Optional[bool] = Query(True),
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; overrides page"),
+    count: CountStrategy = Query(CountStrategy.EXACT, description="How to compute total"),
     current_user: User = Depends(get_current_admin),
     session: AsyncSession = Depends(get_session)
 ):
@@ -50,29 +57,28 @@ async def list_products_admin(
     is_admin = current_user.role in [UserRole.ADMIN, UserRole.SUPER_ADMIN]
     # Sellers only see their own products
     seller_id_filter = None if is_admin else current_user.id
-
-    products = await product_service.list_products(
-        skip=skip,
-        limit=page_size,
+    filters = dict(
         category_id=category_id,
         brand_id=brand_id,
         is_active=is_active,
         search=search,
-        seller_id=seller_id_filter
+        seller_id=seller_id_filter,
     )
 
-    total = await product_service.count_products(
-        category_id=category_id,
-        brand_id=brand_id,
-        is_active=is_active,
-        seller_id=seller_id_filter
-    )
+    # One extra row tells whether there is a next page.
+    products = await product_service.list_products(skip=skip, limit=page_size + 1, cursor=cursor, **filters)
+    has_more = len(products) > page_size
+    products = products[:page_size]
+
+    total = await product_service.total_products(count, **filters)
 
     return PaginatedProductsAdmin(
         items=products,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        has_more=has_more,
+        next_cursor=product_service.product_cursor(products[-1]) if has_more else None,
     )
 
 
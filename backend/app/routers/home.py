@@ -1,20 +1,17 @@
 """Home page bootstrap — one round-trip for initial shop load."""
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import response_cache
-from app.database import get_session
+from app.core.cache_warmer import cache_warmer
+from app.core.cached_endpoint import cached_endpoint
 from app.models.banner import BannerRead
-from app.models.category import Category
 from app.models.promo_code import PromoCodeRead
 from app.services.banner_service import BannerService
 from app.services.product_service import ProductService
-from app.services.promo_code_service import PromoCodeService
-from app.routers.categories import _category_product_image_map, _read_category
-from sqlmodel import select
+from app.services.promo_code_service import PromoCodeService, schedule_expiry_invalidation
+from app.services.category_registry import category_registry
 
 router = APIRouter()
 
@@ -28,23 +25,16 @@ class HomeBootstrapResponse(BaseModel):
 
 
 @router.get("/bootstrap", response_model=HomeBootstrapResponse)
+@cached_endpoint("home_bootstrap", ttl_seconds=60, stale_seconds=30)
 async def home_bootstrap(
+    session: AsyncSession,
     featured_limit: int = Query(20, ge=1, le=50),
     discounted_limit: int = Query(20, ge=1, le=50),
-    session: AsyncSession = Depends(get_session),
-):
+) -> dict:
     """
     Single request for homepage: featured, discounts, categories, promos, banners.
     Replaces 5 separate frontend calls on first load.
     """
-    cache_key = ("home_bootstrap", featured_limit, discounted_limit)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=60, stale-while-revalidate=30"},
-        )
-
     product_service = ProductService(session)
     promo_service = PromoCodeService(session)
     banner_service = BannerService(session)
@@ -56,22 +46,13 @@ async def home_bootstrap(
         limit=discounted_limit, is_active=True, is_discounted_featured=True
     )
 
-    cat_result = await session.execute(
-        select(Category)
-        .where(Category.is_active == True)
-        .order_by(Category.sort_order, Category.name)
-    )
-    category_rows = cat_result.scalars().all()
-    fallback_images = await _category_product_image_map(session, category_rows)
-    categories = [
-        _read_category(c, fallback_images).model_dump(mode="json")
-        for c in category_rows
-    ]
+    categories = (await category_registry.current(session)).items
 
     promos = await promo_service.list_active_public(limit=3)
+    schedule_expiry_invalidation(promos)
     banners = await banner_service.list_banners(is_active=True)
 
-    content = HomeBootstrapResponse(
+    return HomeBootstrapResponse(
         featured=[i.model_dump(mode="json") for i in featured],
         discounted=[i.model_dump(mode="json") for i in discounted],
         categories=categories,
@@ -79,8 +60,5 @@ async def home_bootstrap(
         banners=[BannerRead.model_validate(b).model_dump(mode="json") for b in banners],
     ).model_dump(mode="json")
 
-    response_cache.set(cache_key, content, ttl_seconds=60)
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=60, stale-while-revalidate=30"},
-    )
+
+cache_warmer.register("home_bootstrap", home_bootstrap.fill)
@@ -1,31 +1,51 @@
 """
 Products Router - Public product endpoints
 """
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.core.cache import response_cache
+from app.config import settings
+from app.core.cache import product_tag
+from app.core.cache_warmer import cache_warmer
+from app.core.cached_endpoint import cached_endpoint
+from app.core.exceptions import BadRequestException
 from app.core.seller_branding import normalize_seller_name
-from app.database import get_session
-from app.models.product import Product, ProductListRead, ProductRead
+from app.database import async_session_maker, get_session, run_in_session
+from app.models.product import Product, ProductFacets, ProductListRead, ProductRead
+from app.services import product_facets, product_search_index
+from app.services.product_fuzzy import warm_trigram_index
+from app.services.brand_stats import brand_stats_query
+from app.services.category_registry import category_registry
+from app.services.product_counts import CountStrategy
+from app.services.product_sort import ProductSort
 from app.services.product_service import ProductService
+from app.services.product_snapshot import product_snapshot
+from app.services.product_suggest import suggest_index
 from sqlmodel import select
 
 router = APIRouter()
 
 
 class PaginatedProducts(BaseModel):
-    """Paginated products response."""
+    """
+    Paginated products response. ``total``/``pages`` are None for cursor
+    pages and with ``count=has_more``; estimated with ``count=estimate``.
+    """
     items: list[ProductListRead]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int]
+    has_more: bool = False
+    # Pass as ``cursor`` to fetch the next page without an OFFSET scan
+    next_cursor: Optional[str] = None
+    # Counts per brand, category, price and discount range for the filters (``facets=true``)
+    facets: Optional[ProductFacets] = None
 
 
 def _primary_image(product: Product) -> Optional[str]:
@@ -72,156 +92,119 @@ def _to_public_read(product: Product) -> ProductRead:
     return product_data
 
 
+async def _build_products_page(
+    session: AsyncSession,
+    *,
+    page: int,
+    page_size: int,
+    is_featured: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    count: CountStrategy = CountStrategy.EXACT,
+    facets: bool = False,
+    **filters,
+) -> dict:
+    products, total, next_cursor = await ProductService(session).list_product_summaries_page(
+        skip=(page - 1) * page_size,
+        limit=page_size,
+        cursor=cursor,
+        count=count,
+        is_featured=is_featured,
+        is_active=True,
+        **filters,
+    )
+    return PaginatedProducts(
+        items=products,
+        total=total,
+        page=page,
+        page_size=page_size,
+        pages=(total + page_size - 1) // page_size if total is not None else None,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
+        facets=await _load_facets(is_featured=is_featured, **filters) if facets else None,
+    ).model_dump(mode="json")
+
+
+async def _load_facets(*, fuzzy: bool = False, sort: Optional[ProductSort] = None, **filters) -> dict:
+    """Facet counts for a listing's filters; shared by every page and sort of it."""
+    return await product_facets.cached_facets(dict(filters, is_active=True), fuzzy=fuzzy)
+
+
 @router.get("", response_model=PaginatedProducts)
+@cached_endpoint("products_list", ttl_seconds=60, stale_seconds=30)
 async def list_products(
+    session: AsyncSession,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     category_id: Optional[UUID] = None,
+    include_descendants: bool = Query(False, description="Also match products in subcategories of category_id"),
     brand_id: Optional[UUID] = None,
     search: Optional[str] = None,
+    fuzzy: bool = Query(False, description="Match misspellings by trigram similarity"),
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_discount: Optional[float] = None,
     in_stock: Optional[bool] = None,
     is_featured: Optional[bool] = None,
-    session: AsyncSession = Depends(get_session)
-):
+    sort: ProductSort = Query(ProductSort.RELEVANCE, description="Result ordering"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; overrides page"),
+    count: CountStrategy = Query(CountStrategy.EXACT, description="How to compute total"),
+    facets: bool = Query(False, description="Also return facet counts for these filters"),
+) -> dict:
     """
     List products with filtering and pagination.
     Cached for 60 seconds (public catalog browsing).
+    Infinite scroll should follow ``next_cursor`` rather than page numbers.
     """
-    cache_key = (
-        "products_list",
-        page,
-        page_size,
-        str(category_id) if category_id else "",
-        str(brand_id) if brand_id else "",
-        search or "",
-        min_price,
-        max_price,
-        min_discount,
-        in_stock,
-        is_featured,
-    )
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=60"},
-        )
-
-    product_service = ProductService(session)
-    skip = (page - 1) * page_size
-
-    products, total = await product_service.list_product_summaries(
-        skip=skip,
-        limit=page_size,
+    return await _build_products_page(
+        session,
+        page=page,
+        page_size=page_size,
         category_id=category_id,
+        include_descendants=include_descendants,
         brand_id=brand_id,
         search=search,
+        fuzzy=fuzzy,
         min_price=min_price,
         max_price=max_price,
         min_discount=min_discount,
         in_stock=in_stock,
         is_featured=is_featured,
-        is_active=True,
-        include_total=True,
+        sort=sort,
+        cursor=cursor,
+        count=count,
+        facets=facets,
     )
 
-    pages = (total + page_size - 1) // page_size
 
-    response = PaginatedProducts(
-        items=products,
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=pages,
-    )
-    content = response.model_dump(mode="json")
-    response_cache.set(cache_key, content, ttl_seconds=60)
-
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=60"},
+async def _build_product_cards(session: AsyncSession, *, limit: int, **filters) -> list:
+    products, _ = await ProductService(session).list_product_summaries(
+        limit=limit,
+        is_active=True,
+        **filters,
     )
+    return [i.model_dump(mode="json") for i in products]
 
 
 @router.get("/featured", response_model=list[ProductListRead])
+@cached_endpoint("products_featured", ttl_seconds=120, stale_seconds=30)
 async def get_featured_products(
+    session: AsyncSession,
     limit: int = Query(10, ge=1, le=200),
-    session: AsyncSession = Depends(get_session)
-):
+) -> list:
     """Get featured products. Cached for 2 minutes (public, rarely changes)."""
-    cache_key = ("products_featured", limit)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-        )
-
-    product_service = ProductService(session)
-
-    products, _ = await product_service.list_product_summaries(
-        limit=limit,
-        is_featured=True,
-        is_active=True,
-    )
-
-    content = [i.model_dump(mode="json") for i in products]
-    response_cache.set(cache_key, content, ttl_seconds=120)
-
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-    )
+    return await _build_product_cards(session, limit=limit, is_featured=True)
 
 
 @router.get("/brands/featured")
-async def get_featured_brands(
-    session: AsyncSession = Depends(get_session)
-):
+@cached_endpoint("products_brands_featured", ttl_seconds=300, stale_seconds=60)
+async def get_featured_brands(session: AsyncSession) -> list:
     """
     Get brands with their maximum discount percentage from actual product data.
     Cached for 5 minutes.
     """
-    cache_key = ("products_brands_featured",)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=300, stale-while-revalidate=60"},
-        )
+    from app.models.brand import BrandStats
 
-    from sqlalchemy import func, case
-    from app.models.brand import Brand
-
-    query = (
-        select(
-            Brand.id,
-            Brand.name,
-            Brand.slug,
-            Brand.logo_url,
-            func.max(
-                case(
-                    (Product.mrp > 0, (Product.mrp - Product.selling_price) / Product.mrp * 100),
-                    else_=0
-                )
-            ).label("max_discount"),
-        )
-        .join(Product, Product.brand_id == Brand.id)
-        .where(Product.is_active == True)
-        .where(Brand.is_active == True)
-        .group_by(Brand.id, Brand.name, Brand.slug, Brand.logo_url)
-        .having(func.count(Product.id) > 0)
-        .order_by(func.max(
-            case(
-                (Product.mrp > 0, (Product.mrp - Product.selling_price) / Product.mrp * 100),
-                else_=0
-            )
-        ).desc())
-        .limit(12)
-    )
+    query = brand_stats_query().order_by(BrandStats.max_discount.desc()).limit(12)
 
     result = await session.execute(query)
     rows = result.all()
@@ -236,59 +219,25 @@ async def get_featured_brands(
             "logo_url": row.logo_url,
             "max_discount": discount,
         })
-
-    response_cache.set(cache_key, items, ttl_seconds=300)
-    return JSONResponse(
-        content=items,
-        headers={"Cache-Control": "public, max-age=300, stale-while-revalidate=60"},
-    )
+    return items
 
 
 @router.get("/brands")
-async def get_product_brands(
-    session: AsyncSession = Depends(get_session)
-):
+@cached_endpoint("products_brands", ttl_seconds=300, stale_seconds=60)
+async def get_product_brands(session: AsyncSession) -> list:
     """
     Get all active brands that have active products.
     Used for public product filters.
     """
-    cache_key = ("products_brands",)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=300, stale-while-revalidate=60"},
-        )
-
-    from sqlalchemy import func, case
-    from app.models.brand import Brand
+    return await _load_filter_brands(session)
 
-    discount_expr = func.max(
-        case(
-            (Product.mrp > 0, (Product.mrp - Product.selling_price) / Product.mrp * 100),
-            else_=0
-        )
-    )
 
-    query = (
-        select(
-            Brand.id,
-            Brand.name,
-            Brand.slug,
-            Brand.logo_url,
-            discount_expr.label("max_discount"),
-            func.count(Product.id).label("product_count"),
-        )
-        .join(Product, Product.brand_id == Brand.id)
-        .where(Product.is_active == True)
-        .where(Brand.is_active == True)
-        .group_by(Brand.id, Brand.name, Brand.slug, Brand.logo_url)
-        .having(func.count(Product.id) > 0)
-        .order_by(Brand.name.asc())
-    )
+async def _load_filter_brands(session: AsyncSession) -> list:
+    """Brand filter entries (count, best discount, price range) from the ``brand_stats`` rollup."""
+    from app.models.brand import Brand
 
-    result = await session.execute(query)
-    items = [
+    result = await session.execute(brand_stats_query().order_by(Brand.name.asc()))
+    return [
         {
             "id": str(row.id),
             "name": row.name,
@@ -296,33 +245,21 @@ async def get_product_brands(
             "logo_url": row.logo_url,
             "max_discount": int(row.max_discount) if row.max_discount else 0,
             "product_count": int(row.product_count or 0),
+            "min_price": float(row.min_price),
+            "max_price": float(row.max_price),
         }
         for row in result.all()
     ]
 
-    response_cache.set(cache_key, items, ttl_seconds=300)
-    return JSONResponse(
-        content=items,
-        headers={"Cache-Control": "public, max-age=300, stale-while-revalidate=60"},
-    )
-
 
 @router.get("/search-index")
-async def get_search_index(
-    session: AsyncSession = Depends(get_session)
-):
+@cached_endpoint("products_search_index", ttl_seconds=300, stale_seconds=60)
+async def get_search_index(session: AsyncSession) -> list:
     """
     Lightweight search index: returns minimal product data for client-side
     instant search. Cached for 5 minutes. Optimized with direct SQL.
+    Capped at 2000 rows; new clients should use ``/search-index/compact``.
     """
-    cache_key = ("products_search_index",)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=300, stale-while-revalidate=60"},
-        )
-
     query = (
         select(
             Product.id,
@@ -356,45 +293,73 @@ async def get_search_index(
             "short_description": row.short_description or "",
             "seller_name": normalize_seller_name(row.seller_name),
         })
+    return items
+
 
-    response_cache.set(cache_key, items, ttl_seconds=300)
-    return JSONResponse(
-        content=items,
-        headers={"Cache-Control": "public, max-age=300, stale-while-revalidate=60"},
+@router.get("/search-index/compact")
+async def get_compact_search_index(
+    since: Optional[int] = Query(None, ge=0, description="Index version the client already holds"),
+    format: Literal["json", "msgpack"] = "json",
+):
+    """
+    Versioned, columnar search index covering the whole active catalog,
+    streamed in chunks. With ``since``, only rows changed after that
+    version are sent, plus the ids of products that were removed.
+    """
+    if format == "msgpack" and product_search_index.msgpack is None:
+        raise BadRequestException("msgpack output is not available")
+    encode = product_search_index.stream_msgpack if format == "msgpack" else product_search_index.stream_json
+
+    async def body():
+        async with async_session_maker() as session:
+            async for part in encode(product_search_index.iter_frames(session, since)):
+                yield part
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-msgpack" if format == "msgpack" else "application/json",
+        headers={"Cache-Control": "public, max-age=60"},
     )
 
+
+class ProductSuggestion(BaseModel):
+    """One typeahead completion: a product, brand or category."""
+    type: str
+    text: str
+    slug: str
+    id: str
+    sku: Optional[str] = None
+    selling_price: Optional[float] = None
+    image: Optional[str] = None
+
+
+@router.get("/suggest", response_model=list[ProductSuggestion])
+async def suggest(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Typeahead completions for product names, SKUs, brands and categories,
+    served from an in-memory prefix index covering the whole active catalog.
+    """
+    index = await suggest_index.current(session)
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return index.suggest(q, limit)
+
+
 @router.get("/discounted-featured", response_model=list[ProductListRead])
+@cached_endpoint("products_discounted_featured", ttl_seconds=120, stale_seconds=30)
 async def get_discounted_featured_products(
+    session: AsyncSession,
     limit: int = Query(20, ge=1, le=100),
-    session: AsyncSession = Depends(get_session)
-):
+) -> list:
     """
     Get admin-curated discounted products for the Live Discounts section on the home page.
     Only products with is_discounted_featured=True are returned.
     """
-    cache_key = ("products_discounted_featured", limit)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-        )
-
-    product_service = ProductService(session)
-
-    products, _ = await product_service.list_product_summaries(
-        limit=limit,
-        is_active=True,
-        is_discounted_featured=True,
-    )
-
-    content = [i.model_dump(mode="json") for i in products]
-    response_cache.set(cache_key, content, ttl_seconds=120)
-
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-    )
+    return await _build_product_cards(session, limit=limit, is_discounted_featured=True)
 
 
 class CatalogBootstrapResponse(BaseModel):
@@ -405,125 +370,58 @@ class CatalogBootstrapResponse(BaseModel):
 
 
 @router.get("/catalog-bootstrap", response_model=CatalogBootstrapResponse)
+@cached_endpoint("catalog_bootstrap", ttl_seconds=60, stale_seconds=30)
 async def catalog_bootstrap(
+    session: AsyncSession,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     category_id: Optional[UUID] = None,
+    include_descendants: bool = Query(False, description="Also match products in subcategories of category_id"),
     brand_id: Optional[UUID] = None,
     search: Optional[str] = None,
+    fuzzy: bool = Query(False, description="Match misspellings by trigram similarity"),
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_discount: Optional[float] = None,
     in_stock: Optional[bool] = None,
-    session: AsyncSession = Depends(get_session),
-):
+    sort: ProductSort = Query(ProductSort.RELEVANCE, description="Ordering of products"),
+    count: CountStrategy = Query(CountStrategy.EXACT, description="How to compute products.total"),
+    facets: bool = Query(False, description="Also return products.facets for these filters"),
+) -> dict:
     """
     One request for the products page: categories, brands, and paginated products.
     Replaces 3 separate frontend calls (~400–900ms saved on cold paths).
     """
-    cache_key = (
-        "catalog_bootstrap",
-        page,
-        page_size,
-        str(category_id) if category_id else "",
-        str(brand_id) if brand_id else "",
-        search or "",
-        min_price,
-        max_price,
-        min_discount,
-        in_stock,
-    )
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=60, stale-while-revalidate=30"},
-        )
-
-    from app.models.category import Category, CategoryRead
-    from app.models.brand import Brand
-    from sqlalchemy import func, case
-
-    product_service = ProductService(session)
-    skip = (page - 1) * page_size
-
-    cat_result = await session.execute(
-        select(Category)
-        .where(Category.is_active == True)
-        .order_by(Category.sort_order, Category.name)
-    )
-    categories = [
-        CategoryRead.model_validate(c).model_dump(mode="json")
-        for c in cat_result.scalars().all()
-    ]
-
-    discount_expr = func.max(
-        case(
-            (Product.mrp > 0, (Product.mrp - Product.selling_price) / Product.mrp * 100),
-            else_=0,
-        )
-    )
-    brand_result = await session.execute(
-        select(
-            Brand.id,
-            Brand.name,
-            Brand.slug,
-            Brand.logo_url,
-            discount_expr.label("max_discount"),
-            func.count(Product.id).label("product_count"),
-        )
-        .join(Product, Product.brand_id == Brand.id)
-        .where(Product.is_active == True)
-        .where(Brand.is_active == True)
-        .group_by(Brand.id, Brand.name, Brand.slug, Brand.logo_url)
-        .having(func.count(Product.id) > 0)
-        .order_by(Brand.name.asc())
-    )
-    brands = [
-        {
-            "id": str(row.id),
-            "name": row.name,
-            "slug": row.slug,
-            "logo_url": row.logo_url,
-            "max_discount": int(row.max_discount) if row.max_discount else 0,
-            "product_count": int(row.product_count or 0),
-        }
-        for row in brand_result.all()
-    ]
-
-    products, total = await product_service.list_product_summaries(
-        skip=skip,
-        limit=page_size,
+    return await _build_catalog_bootstrap(
+        session,
+        page=page,
+        page_size=page_size,
         category_id=category_id,
+        include_descendants=include_descendants,
         brand_id=brand_id,
         search=search,
+        fuzzy=fuzzy,
         min_price=min_price,
         max_price=max_price,
         min_discount=min_discount,
         in_stock=in_stock,
-        is_active=True,
-        include_total=True,
-    )
-    pages = (total + page_size - 1) // page_size
-    paginated = PaginatedProducts(
-        items=products,
-        total=total,
-        page=page,
-        page_size=page_size,
-        pages=pages,
+        sort=sort,
+        count=count,
+        facets=facets,
     )
 
-    content = CatalogBootstrapResponse(
+
+async def _build_catalog_bootstrap(session: AsyncSession, *, page: int, page_size: int, **filters) -> dict:
+    categories = (await category_registry.current(session)).items
+    brands = await _load_filter_brands(session)
+
+    paginated = await _build_products_page(session, page=page, page_size=page_size, **filters)
+
+    return CatalogBootstrapResponse(
         categories=categories,
         brands=brands,
         products=paginated,
     ).model_dump(mode="json")
-    response_cache.set(cache_key, content, ttl_seconds=60)
-
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=60, stale-while-revalidate=30"},
-    )
 
 
 class ProductDetailBundle(BaseModel):
@@ -533,20 +431,15 @@ class ProductDetailBundle(BaseModel):
     related: list[ProductListRead]
 
 
+def _detail_bundle_tags(content: dict) -> list[str]:
+    items = [content["product"], *content["variants"], *content["related"]]
+    return [product_tag(item["id"]) for item in items]
+
+
 @router.get("/{slug}/detail", response_model=ProductDetailBundle)
-async def get_product_detail_bundle(
-    slug: str,
-    session: AsyncSession = Depends(get_session),
-):
+@cached_endpoint("product_detail_bundle", ttl_seconds=120, stale_seconds=30, tags=_detail_bundle_tags)
+async def get_product_detail_bundle(session: AsyncSession, slug: str) -> dict:
     """Single round-trip for product detail page (product, variants, related)."""
-    cache_key = ("product_detail_bundle", slug)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-        )
-
     product_service = ProductService(session)
     product = await product_service.get_product_by_slug(slug)
     variants = await product_service.get_product_variants(slug)
@@ -567,40 +460,20 @@ async def get_product_detail_bundle(
         variants=[_to_list_read(v) for v in variants],
         related=related_items,
     )
-    content = bundle.model_dump(mode="json")
-    response_cache.set(cache_key, content, ttl_seconds=120)
-
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-    )
+    return bundle.model_dump(mode="json")
 
 
 @router.get("/{slug}", response_model=ProductRead)
-async def get_product_by_slug(
-    slug: str,
-    session: AsyncSession = Depends(get_session)
-):
+@cached_endpoint(
+    "product_slug",
+    ttl_seconds=120,
+    stale_seconds=30,
+    tags=lambda content: [product_tag(content["id"])],
+)
+async def get_product_by_slug(session: AsyncSession, slug: str) -> dict:
     """Get product details by slug. Cached 2 minutes."""
-    cache_key = ("product_slug", slug)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-        )
-
-    product_service = ProductService(session)
-    product = await product_service.get_product_by_slug(slug)
-
-    product_data = _to_public_read(product)
-    content = product_data.model_dump(mode="json")
-    response_cache.set(cache_key, content, ttl_seconds=120)
-
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=120, stale-while-revalidate=30"},
-    )
+    product = await ProductService(session).get_product_by_slug(slug)
+    return _to_public_read(product).model_dump(mode="json")
 
 
 @router.get("/{slug}/variants", response_model=list[ProductListRead])
@@ -612,3 +485,35 @@ async def get_product_variants(
     product_service = ProductService(session)
     variants = await product_service.get_product_variants(slug)
     return [_to_list_read(v) for v in variants]
+
+
+async def _load_popular_slugs(session: AsyncSession, limit: int) -> list[str]:
+    return await ProductService(session).list_popular_slugs(limit)
+
+
+async def _warm_popular_product_details() -> None:
+    # One bundle at a time: warming must not crowd visitors out of the pool.
+    slugs = await run_in_session(_load_popular_slugs, settings.response_cache_warm_top_products)
+    for slug in slugs:
+        await get_product_detail_bundle.fill(slug=slug)
+
+
+async def _warm_product_snapshot() -> None:
+    if product_snapshot.enabled():
+        await run_in_session(product_snapshot.refresh)
+    elif settings.product_snapshot_enabled:
+        print("Product snapshot: numpy is not installed; listings use SQL")
+
+
+async def _warm_catalog_bootstrap() -> None:
+    # Targets run concurrently: bring the snapshot up to date before the
+    # bootstrap listing reads from it.
+    await _warm_product_snapshot()
+    await catalog_bootstrap.fill()
+
+
+cache_warmer.register("catalog_bootstrap", _warm_catalog_bootstrap)
+cache_warmer.register("products_search_index", get_search_index.fill)
+cache_warmer.register("products_suggest", lambda: run_in_session(suggest_index.refresh))
+cache_warmer.register("products_fuzzy", warm_trigram_index)
+cache_warmer.register("product_detail_bundle", _warm_popular_product_details)
@@ -2,17 +2,16 @@
 
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import response_cache
+from app.core.cached_endpoint import cached_endpoint
 from app.core.dependencies import get_current_active_user
 from app.database import get_session
 from app.models.promo_code import PromoCodeRead
 from app.models.user import User
-from app.services.promo_code_service import PromoCodeService
+from app.services.promo_code_service import PromoCodeService, schedule_expiry_invalidation
 
 router = APIRouter()
 
@@ -28,27 +27,12 @@ class PromoValidateResponse(BaseModel):
 
 
 @router.get("/active", response_model=list[PromoCodeRead])
-async def list_active_promo_codes(
-    limit: int = 6,
-    session: AsyncSession = Depends(get_session),
-):
-    safe_limit = max(1, min(limit, 10))
-    cache_key = ("promo_codes_active", safe_limit)
-    cached = response_cache.get(cache_key)
-    if cached is not None:
-        return JSONResponse(
-            content=cached,
-            headers={"Cache-Control": "public, max-age=60, stale-while-revalidate=30"},
-        )
-
+@cached_endpoint("promo_codes_active", ttl_seconds=60, stale_seconds=30)
+async def list_active_promo_codes(session: AsyncSession, limit: int = Query(6, ge=1, le=10)) -> list:
     service = PromoCodeService(session)
-    promos = await service.list_active_public(limit=safe_limit)
-    content = [PromoCodeRead.model_validate(promo).model_dump(mode="json") for promo in promos]
-    response_cache.set(cache_key, content, ttl_seconds=60)
-    return JSONResponse(
-        content=content,
-        headers={"Cache-Control": "public, max-age=60, stale-while-revalidate=30"},
-    )
+    promos = await service.list_active_public(limit=limit)
+    schedule_expiry_invalidation(promos)
+    return [PromoCodeRead.model_validate(promo).model_dump(mode="json") for promo in promos]
 
 
 @router.post("/validate", response_model=PromoValidateResponse)
@@ -8,9 +8,16 @@ from sqlalchemy import desc, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import response_cache
+from app.core.catalog_version import catalog_version
 from app.models.banner import Banner, BannerCreate, BannerUpdate
 
 
+def _clear_public_banner_cache() -> None:
+    # Banners are also part of the home bootstrap payload.
+    response_cache.clear_prefix("banners_active", "home_bootstrap")
+    catalog_version.bump()
+
+
 class BannerService:
     """Banner service for database operations."""
     
@@ -56,7 +63,7 @@ class BannerService:
         self.session.add(banner)
         await self.session.commit()
         await self.session.refresh(banner)
-        response_cache.clear_prefix("banners_active")
+        _clear_public_banner_cache()
         return banner
     
     async def update_banner(self, banner: Banner, banner_in: BannerUpdate) -> Banner:
@@ -68,11 +75,11 @@ class BannerService:
         self.session.add(banner)
         await self.session.commit()
         await self.session.refresh(banner)
-        response_cache.clear_prefix("banners_active")
+        _clear_public_banner_cache()
         return banner
     
     async def delete_banner(self, banner: Banner) -> None:
         """Delete a banner."""
         await self.session.delete(banner)
         await self.session.commit()
-        response_cache.clear_prefix("banners_active")
+        _clear_public_banner_cache()
@@ -0,0 +1,81 @@
+"""
+Per-brand rollup of active products (``brand_stats``).
+
+``/products/brands``, ``/products/brands/featured`` and catalog-bootstrap
+list brands with their product count and best discount. Rather than
+aggregating the whole catalog on every cache miss they read this table.
+Writes that can move a brand's numbers (price, activity or brand changes)
+recompute just the touched brands with ``refresh_brand_stats``, an indexed
+aggregate over those brands' products; startup recomputes every brand.
+"""
+from datetime import datetime
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlmodel import select
+
+from app.models.brand import Brand, BrandStats
+from app.models.product import Product
+
+
+async def refresh_brand_stats(conn, brand_ids: Optional[Iterable[Any]] = None) -> int:
+    """
+    Recompute the rollup of ``brand_ids`` (every brand when None); ``conn``
+    is a session or connection and the caller commits. Returns rows written.
+    """
+    if brand_ids is not None:
+        brand_ids = {UUID(str(brand_id)) for brand_id in brand_ids if brand_id}
+        if not brand_ids:
+            return 0
+
+    query = (
+        sa.select(
+            Product.brand_id,
+            sa.func.count(Product.id).label("product_count"),
+            sa.func.max(Product.discount_percent).label("max_discount"),
+            sa.func.min(Product.selling_price).label("min_price"),
+            sa.func.max(Product.selling_price).label("max_price"),
+        )
+        .where(Product.is_active == True, Product.brand_id.isnot(None))
+        .group_by(Product.brand_id)
+    )
+    delete = sa.delete(BrandStats.__table__)
+    if brand_ids is not None:
+        query = query.where(Product.brand_id.in_(brand_ids))
+        delete = delete.where(BrandStats.brand_id.in_(brand_ids))
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "brand_id": row.brand_id,
+            "product_count": row.product_count,
+            "max_discount": row.max_discount or 0,
+            "min_price": row.min_price or 0,
+            "max_price": row.max_price or 0,
+            "updated_at": now,
+        }
+        for row in (await conn.execute(query)).all()
+    ]
+    await conn.execute(delete)
+    if rows:
+        await conn.execute(sa.insert(BrandStats.__table__), rows)
+    return len(rows)
+
+
+def brand_stats_query():
+    """Active brands with active products, joined to their rollup."""
+    return (
+        select(
+            Brand.id,
+            Brand.name,
+            Brand.slug,
+            Brand.logo_url,
+            BrandStats.product_count,
+            BrandStats.max_discount,
+            BrandStats.min_price,
+            BrandStats.max_price,
+        )
+        .join(BrandStats, BrandStats.brand_id == Brand.id)
+        .where(Brand.is_active == True, BrandStats.product_count > 0)
+    )
@@ -9,8 +9,8 @@ import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
 from slugify import slugify
 
-from app.core.cache import response_cache
 from app.models.product import Product, ProductCreate, ProductImage
+from app.services import brand_stats, category_covers, product_categories, product_listing_fields
 from app.services.product_service import ProductService
 from app.services.storage_service import storage_service
 
@@ -28,6 +28,10 @@ class BulkUploadService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.product_service = ProductService(session)
+        self._touched_product_ids: set[UUID] = set()
+        self._touched_category_ids: set[UUID] = set()
+        self._touched_products: dict[UUID, Product] = {}
+        self._touched_brand_ids: set[UUID] = set()
 
     def _normalize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normalize known external CSV formats (e.g., WooCommerce export) to expected columns."""
@@ -147,18 +151,18 @@ class BulkUploadService:
                     "error": str(e)
                 })
         
+        if self._touched_products:
+            await product_categories.sync_product_categories(self.session, self._touched_products.values())
+            await product_listing_fields.refresh_listing_fields(self.session, self._touched_products.values())
+            await self.session.flush()
+            await brand_stats.refresh_brand_stats(self.session, self._touched_brand_ids)
+            await category_covers.refresh_category_covers(self.session, self._touched_category_ids)
         await self.session.commit()
         if created or updated:
-            for prefix in (
-                "products_featured",
-                "products_brands_featured",
-                "products_brands",
-                "products_search_index",
-                "categories_list",
-                "categories_tree",
-                "categories_slug",
-            ):
-                response_cache.clear_prefix(prefix)
+            ProductService._clear_public_product_cache(
+                product_ids=self._touched_product_ids,
+                category_ids=self._touched_category_ids,
+            )
         
         return {
             "success": True,
@@ -186,6 +190,7 @@ class BulkUploadService:
         if existing:
             if not update_existing:
                 return "skipped"
+            self._track_touched(existing)
             
             # Update existing product
             if pd.notna(row.get("name")):
@@ -224,6 +229,7 @@ class BulkUploadService:
                 await self._process_product_images(existing.id, str(row["Images"]), existing)
             
             self.session.add(existing)
+            self._track_touched(existing)
             return "updated"
         
         # Create new product
@@ -268,7 +274,17 @@ class BulkUploadService:
         if pd.notna(row.get("Images")):
             await self._process_product_images(product.id, str(row["Images"]), product)
         
+        self._track_touched(product)
         return "created"
+
+    def _track_touched(self, product: Product) -> None:
+        """Remember written products so only their cached pages are invalidated."""
+        self._touched_product_ids.add(product.id)
+        self._touched_products[product.id] = product
+        # Called before and after an update, so a product's old brand is kept too.
+        if product.brand_id:
+            self._touched_brand_ids.add(product.brand_id)
+        self._touched_category_ids |= product_categories.category_ids_of(product.category_id, product.category_ids)
     
     async def _process_product_images(
         self,
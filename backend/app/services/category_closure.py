@@ -0,0 +1,57 @@
+"""
+Category tree closure (``category_closure``).
+
+The table holds every (ancestor, descendant) pair of the category tree,
+so "this category and everything under it" is one indexed lookup rather
+than a recursive CTE per request. Categories are few and rarely edited,
+so the whole table is recomputed from ``categories.parent_id`` whenever
+the admin category router writes, and once at startup.
+"""
+from typing import Any, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlmodel import select
+
+from app.models.category import Category, CategoryClosure
+
+
+def closure_rows(parents: dict[UUID, Optional[UUID]]) -> list[dict[str, Any]]:
+    """Closure rows for a ``{category_id: parent_id}`` map; cycles and dangling parents end a walk."""
+    rows = []
+    for category_id in parents:
+        seen = set()
+        node, depth = category_id, 0
+        while node is not None and node in parents and node not in seen:
+            seen.add(node)
+            rows.append({"ancestor_id": node, "descendant_id": category_id, "depth": depth})
+            node, depth = parents[node], depth + 1
+    return rows
+
+
+async def rebuild_category_closure(conn) -> int:
+    """Recompute the closure from ``categories``; ``conn`` is a session or connection. Returns rows written."""
+    result = await conn.execute(sa.select(Category.id, Category.parent_id))
+    rows = closure_rows({row.id: row.parent_id for row in result.all()})
+    await conn.execute(sa.delete(CategoryClosure.__table__))
+    if rows:
+        await conn.execute(sa.insert(CategoryClosure.__table__), rows)
+    return len(rows)
+
+
+def subtree(category_id: UUID):
+    """Subquery of ``category_id`` and the ids of all categories below it."""
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+async def is_in_subtree(session, category_id: UUID, root_id: UUID) -> bool:
+    """Whether ``category_id`` is ``root_id`` or one of its descendants."""
+    if category_id == root_id:
+        return True
+    result = await session.execute(
+        select(CategoryClosure.depth).where(
+            CategoryClosure.ancestor_id == root_id,
+            CategoryClosure.descendant_id == category_id,
+        )
+    )
+    return result.first() is not None
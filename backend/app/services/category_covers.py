@@ -0,0 +1,55 @@
+"""
+Fallback cover images for categories without an ``image_url``.
+
+A category's fallback is the card image (``primary_image_url``) of its
+first active member product with one, featured products first, then
+newest. It is stored in ``categories.fallback_image_url`` so category
+endpoints read it with the category row. Product writes recompute it for
+the categories they touch; startup recomputes every category.
+"""
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlmodel import select
+
+from app.models.category import Category
+from app.models.product import Product, ProductCategory
+
+
+def cover_image_sql():
+    """Correlated subquery for a category's fallback cover image."""
+    return (
+        select(Product.primary_image_url)
+        .join(ProductCategory, ProductCategory.product_id == Product.id)
+        .where(
+            ProductCategory.category_id == Category.id,
+            Product.is_active == True,
+            Product.primary_image_url.isnot(None),
+        )
+        .order_by(Product.is_featured.desc(), Product.created_at.desc())
+        .limit(1)
+        .correlate(Category)
+        .scalar_subquery()
+    )
+
+
+async def refresh_category_covers(conn, category_ids: Optional[Iterable[Any]] = None) -> None:
+    """Recompute the fallback cover of ``category_ids`` (every category when None); the caller commits."""
+    statement = sa.update(Category).values(fallback_image_url=cover_image_sql())
+    if category_ids is not None:
+        ids = set()
+        for category_id in category_ids:
+            try:
+                ids.add(category_id if isinstance(category_id, UUID) else UUID(str(category_id)))
+            except (TypeError, ValueError):
+                continue
+        if not ids:
+            return
+        statement = statement.where(Category.id.in_(ids))
+    await conn.execute(statement.execution_options(synchronize_session=False))
+
+
+def cover_image(category: Category) -> Optional[str]:
+    """The image a category is shown with."""
+    return category.image_url or category.fallback_image_url
@@ -0,0 +1,148 @@
+"""
+Per-process registry of the active categories.
+
+Categories are few and change rarely, yet every category endpoint used to
+reload the whole table and rebuild the tree. The registry loads them once
+into an immutable ``CategorySnapshot``: id and slug maps, the parent/child
+adjacency, breadcrumb paths and the JSON-ready list and tree the public
+endpoints return. Lookups are dict hits with no database round-trip.
+
+The snapshot is tagged with the ``category_version`` it was built at.
+Category edits and product writes (which can move cover images) bump that
+version; the next read rebuilds the snapshot and swaps it in as a single
+reference assignment, so readers always see one complete snapshot. A
+worker that misses a bump (no shared cache tier, another serverless
+instance) still rebuilds once the snapshot is older than
+``CATALOG_INDEX_MAX_AGE_SECONDS``.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.core.catalog_version import category_version
+from app.models.category import Category, CategoryRead, CategoryWithChildren
+from app.services.category_covers import cover_image
+
+
+def read_category(category: Category) -> CategoryRead:
+    data = CategoryRead.model_validate(category)
+    data.image_url = cover_image(category)
+    return data
+
+
+def build_tree(categories: list[Category]) -> list[CategoryWithChildren]:
+    """Build category tree in Python from a flat list — O(N), no N+1."""
+    id_map: dict = {}
+    roots: list[CategoryWithChildren] = []
+
+    # First pass: create all nodes
+    for cat in categories:
+        id_map[cat.id] = CategoryWithChildren(
+            id=cat.id,
+            name=cat.name,
+            slug=cat.slug,
+            description=cat.description,
+            image_url=cover_image(cat),
+            sort_order=cat.sort_order,
+            is_active=cat.is_active,
+            parent_id=cat.parent_id,
+            created_at=cat.created_at,
+            children=[],
+        )
+
+    # Second pass: attach children to parents
+    for cat in categories:
+        node = id_map[cat.id]
+        if cat.parent_id and cat.parent_id in id_map:
+            id_map[cat.parent_id].children.append(node)
+        else:
+            roots.append(node)
+
+    return roots
+
+
+@dataclass(frozen=True)
+class CategorySnapshot:
+    """Active categories in display order (``sort_order``, ``name``), as plain JSON dicts."""
+    version: Optional[int] = None
+    built_at: float = 0.0
+    items: list[dict[str, Any]] = field(default_factory=list)
+    tree: list[dict[str, Any]] = field(default_factory=list)
+    by_id: dict[UUID, dict[str, Any]] = field(default_factory=dict)
+    by_slug: dict[str, dict[str, Any]] = field(default_factory=dict)
+    children: dict[UUID, list[UUID]] = field(default_factory=dict)
+    # Root-first ``{"id", "name", "slug"}`` entries ending with the category itself.
+    paths: dict[UUID, list[dict[str, str]]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, categories: list[Category], version: Optional[int] = None) -> "CategorySnapshot":
+        items = [read_category(category).model_dump(mode="json") for category in categories]
+        by_id = {category.id: item for category, item in zip(categories, items)}
+        parents = {category.id: category.parent_id for category in categories}
+        children: dict[UUID, list[UUID]] = {}
+        for category in categories:
+            if category.parent_id in by_id:
+                children.setdefault(category.parent_id, []).append(category.id)
+
+        paths: dict[UUID, list[dict[str, str]]] = {}
+        for category_id in by_id:
+            path, node = [], category_id
+            while node in by_id and len(path) <= len(by_id):
+                item = by_id[node]
+                path.append({"id": item["id"], "name": item["name"], "slug": item["slug"]})
+                node = parents[node]
+            paths[category_id] = path[::-1]
+
+        return cls(
+            version=version,
+            built_at=time.monotonic(),
+            items=items,
+            tree=[node.model_dump(mode="json") for node in build_tree(categories)],
+            by_id=by_id,
+            by_slug={item["slug"]: item for item in items},
+            children=children,
+            paths=paths,
+        )
+
+    def children_of(self, category_id: UUID) -> list[dict[str, Any]]:
+        return [self.by_id[child_id] for child_id in self.children.get(category_id, ())]
+
+
+class CategoryRegistry:
+    """Holds the current ``CategorySnapshot`` and rebuilds it when the catalog version moves."""
+
+    def __init__(self) -> None:
+        self.snapshot = CategorySnapshot()
+        self._lock = asyncio.Lock()
+
+    async def current(self, session: AsyncSession) -> CategorySnapshot:
+        """The snapshot for the current catalog version, rebuilt first if it is stale."""
+        snapshot = self.snapshot
+        if snapshot.version == category_version.value and not self._expired(snapshot):
+            return snapshot
+        return await self.refresh(session)
+
+    @staticmethod
+    def _expired(snapshot: CategorySnapshot) -> bool:
+        return time.monotonic() - snapshot.built_at > settings.catalog_index_max_age_seconds
+
+    async def refresh(self, session: AsyncSession) -> CategorySnapshot:
+        async with self._lock:
+            version = category_version.value
+            if self.snapshot.version != version or self._expired(self.snapshot):
+                result = await session.execute(
+                    select(Category)
+                    .where(Category.is_active == True)
+                    .order_by(Category.sort_order, Category.name)
+                )
+                self.snapshot = CategorySnapshot.build(list(result.scalars().all()), version)
+            return self.snapshot
+
+
+category_registry = CategoryRegistry()
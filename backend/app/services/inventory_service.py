@@ -9,12 +9,12 @@ from sqlalchemy import func, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.cache import response_cache
 from app.core.exceptions import NotFoundException
 from app.core.seller_branding import LEGACY_SELLER_NAMES, SELLER_DISPLAY_NAME
 from app.models.category import Category
 from app.models.product import Product
 from app.models.user import User
+from app.services.product_service import ProductService
 
 PARLOUR_MATCH_TERMS = (
     "parlour house", "parlour", "parlor house", "parlor",
@@ -98,21 +98,7 @@ async def assign_legacy_inventory_to_parlour_house(
 
     await session.commit()
 
-    for prefix in (
-        "products_list",
-        "products_featured",
-        "products_discounted_featured",
-        "products_brands",
-        "products_search_index",
-        "catalog_bootstrap",
-        "product_detail_bundle",
-        "product_slug",
-        "home_bootstrap",
-        "categories_list",
-        "categories_tree",
-        "categories_slug",
-    ):
-        response_cache.clear_prefix(prefix)
+    ProductService._clear_public_product_cache(product_ids=product_ids, category_ids=category_ids)
 
     if not product_ids and not category_ids:
         return {
@@ -4,7 +4,7 @@ Order Service - Order management operations
 import secrets
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -21,25 +21,14 @@ from app.services.email_service import email_service, is_deliverable_email
 from app.services.payment_service import PaymentService
 from app.models.order import PaymentMethod
 from fastapi import BackgroundTasks
+from app.services.product_service import ProductService
 from app.services.promo_code_service import PromoCodeService
 from app.models.user import UserType
-from app.core.cache import response_cache
 from app.core.delivery import calculate_delivery_fee
 from app.core.pricing import calculate_bulk_discount, calculate_checkout_amounts
 from app.services.storage_service import storage_service
 
 
-def _clear_public_product_cache() -> None:
-    for prefix in (
-        "products_featured",
-        "products_search_index",
-        "categories_list",
-        "categories_tree",
-        "categories_slug",
-    ):
-        response_cache.clear_prefix(prefix)
-
-
 class OrderService:
     """Service for order operations."""
     
@@ -164,6 +153,24 @@ class OrderService:
         }
         order.updated_at = datetime.utcnow()
     
+    async def _adjust_units_sold(self, items: Iterable[OrderItem], sign: int) -> None:
+        """
+        Add (``sign=1``) or take back (``sign=-1``) the active ``items`` in ``Product.units_sold``.
+
+        ``units_sold`` is the popularity sort key; callers clear the public
+        product cache after committing so popularity-sorted listings follow.
+        """
+        quantities: dict[UUID, int] = {}
+        for item in items:
+            if item.product_id and not getattr(item, "is_cancelled", False):
+                quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        if not quantities:
+            return
+        result = await self.session.execute(select(Product).where(Product.id.in_(list(quantities))))
+        for product in result.scalars().all():
+            product.units_sold = max(0, (product.units_sold or 0) + sign * quantities[product.id])
+            self.session.add(product)
+
     def _generate_order_number(self) -> str:
         """Generate unique order number."""
         timestamp = datetime.utcnow().strftime("%Y%m%d")
@@ -414,6 +421,7 @@ class OrderService:
                 
                 # Reduce stock
                 product.stock_quantity -= item_data["quantity"]
+                product.units_sold = (product.units_sold or 0) + item_data["quantity"]
                 self.session.add(product)
             
             # Clear cart with a single bulk DELETE (faster than N individual deletes)
@@ -423,7 +431,7 @@ class OrderService:
             )
 
             await self.session.commit()
-            _clear_public_product_cache()
+            ProductService._clear_public_product_cache(item_data["product"].id for item_data in order_items)
 
             # Mark promo as used after successful commit
             if normalized_promo_code:
@@ -491,6 +499,9 @@ class OrderService:
     ) -> Order:
         """Update order status."""
         order = await self.get_order_by_id(order_id)
+        product_ids = [item.product_id for item in order.items if item.product_id]
+        if (status == OrderStatus.CANCELLED) != (order.status == OrderStatus.CANCELLED):
+            await self._adjust_units_sold(order.items, -1 if status == OrderStatus.CANCELLED else 1)
         order.status = status
         
         # Update timestamps
@@ -502,7 +513,7 @@ class OrderService:
         self.session.add(order)
         await self.session.commit()
         await self.session.refresh(order)
-        _clear_public_product_cache()
+        ProductService._clear_public_product_cache(product_ids)
 
         # Load relationships for response model
         result = await self.session.execute(
@@ -587,6 +598,8 @@ class OrderService:
         item.cancelled_at = datetime.utcnow()
         item.cancellation_reason = cancellation_reason
         self.session.add(item)
+        if order.status != OrderStatus.CANCELLED:
+            await self._adjust_units_sold([item], -1)
 
         await self._recalculate_order_totals(order)
 
@@ -610,7 +623,7 @@ class OrderService:
         order.invoice_url = None
         self.session.add(order)
         await self.session.commit()
-        _clear_public_product_cache()
+        ProductService._clear_public_product_cache([item.product_id])
 
         result = await self.session.execute(
             select(Order)
@@ -684,6 +697,7 @@ class OrderService:
             raise BadRequestException("Cannot cancel order at this stage")
         
         # Restore stock
+        restored = []
         for item in order.items:
             if getattr(item, "is_cancelled", False):
                 continue
@@ -694,11 +708,15 @@ class OrderService:
                 product = product_result.scalar_one_or_none()
                 if product:
                     product.stock_quantity += item.quantity
+                    product.units_sold = max(0, (product.units_sold or 0) - item.quantity)
                     self.session.add(product)
+                    restored.append(product.id)
         
         order.status = OrderStatus.CANCELLED
         self.session.add(order)
         await self.session.commit()
+        if restored:
+            ProductService._clear_public_product_cache(restored)
         await self.session.refresh(order)
 
         # Load relationships for response model
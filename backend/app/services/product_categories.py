@@ -0,0 +1,125 @@
+"""
+Product ↔ category membership (``product_categories``).
+
+A product belongs to its ``category_id`` and to every id listed in its
+``category_ids`` JSON column. The association table mirrors that so
+category filters can use an index; it is rewritten whenever a product's
+categories are written and backfilled at startup for rows written
+before it existed.
+"""
+import json
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.category import Category
+from app.models.product import Product, ProductCategory
+from app.services import category_closure
+
+
+def category_ids_of(category_id: Any, category_ids: Any) -> set[UUID]:
+    """Valid category UUIDs from a product's ``category_id`` and ``category_ids``."""
+    if isinstance(category_ids, str):
+        try:
+            category_ids = json.loads(category_ids)
+        except ValueError:
+            category_ids = []
+    ids = set()
+    for raw in [category_id, *(category_ids if isinstance(category_ids, list) else [])]:
+        if not raw:
+            continue
+        try:
+            ids.add(raw if isinstance(raw, UUID) else UUID(str(raw)))
+        except ValueError:
+            continue
+    return ids
+
+
+async def sync_product_categories(session: AsyncSession, products: Iterable[Product]) -> None:
+    """Rewrite the membership rows of ``products``; the caller commits."""
+    products = list(products)
+    if not products:
+        return
+    await session.flush()
+    await session.execute(
+        sa.delete(ProductCategory).where(ProductCategory.product_id.in_([p.id for p in products]))
+    )
+    wanted = {product.id: category_ids_of(product.category_id, product.category_ids) for product in products}
+    # category_ids is free-form JSON: ids of deleted categories would break the FK.
+    requested = set().union(*wanted.values())
+    known = set()
+    if requested:
+        result = await session.execute(select(Category.id).where(Category.id.in_(requested)))
+        known = set(result.scalars().all())
+    session.add_all(
+        ProductCategory(product_id=product_id, category_id=category_id)
+        for product_id, category_ids in wanted.items()
+        for category_id in category_ids
+        if category_id in known
+    )
+
+
+async def remove_category(session: AsyncSession, category_id: UUID) -> list[UUID]:
+    """
+    Drop ``category_id`` from every product: its membership rows and its
+    entry in ``category_ids``. Returns the ids of the products rewritten;
+    the caller commits.
+    """
+    await session.execute(sa.delete(ProductCategory).where(ProductCategory.category_id == category_id))
+    result = await session.execute(
+        select(Product).where(sa.cast(Product.category_ids, sa.String).like(f"%{category_id}%"))
+    )
+    touched = []
+    for product in result.scalars().all():
+        remaining = [c for c in (product.category_ids or []) if str(c) != str(category_id)]
+        if len(remaining) != len(product.category_ids or []):
+            product.category_ids = remaining
+            session.add(product)
+            touched.append(product.id)
+    return touched
+
+
+def in_category(category_id: UUID, include_descendants: bool = False):
+    """
+    WHERE clause for products that belong to ``category_id`` or, with
+    ``include_descendants``, to it or any category below it.
+    """
+    if include_descendants:
+        condition = ProductCategory.category_id.in_(category_closure.subtree(category_id))
+    else:
+        condition = ProductCategory.category_id == category_id
+    return Product.id.in_(select(ProductCategory.product_id).where(condition))
+
+
+async def backfill_product_categories(conn) -> int:
+    """Add membership rows for products that have none yet (idempotent); returns rows added."""
+    products = sa.table("products", sa.column("id"), sa.column("category_id"), sa.column("category_ids"))
+    memberships = sa.table("product_categories", sa.column("product_id"), sa.column("category_id"))
+    categories = sa.table("categories", sa.column("id"))
+
+    result = await conn.execute(
+        sa.select(products.c.id, products.c.category_id, products.c.category_ids).where(
+            ~sa.exists().where(memberships.c.product_id == products.c.id),
+            sa.or_(products.c.category_id.isnot(None), products.c.category_ids.isnot(None)),
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+    known = {_as_uuid(row[0]) for row in (await conn.execute(sa.select(categories.c.id))).all()}
+    values = [
+        {"product_id": _as_uuid(row.id), "category_id": category_id}
+        for row in rows
+        for category_id in category_ids_of(row.category_id, row.category_ids)
+        if category_id in known
+    ]
+    if values:
+        await conn.execute(sa.insert(ProductCategory.__table__), values)
+    return len(values)
+
+
+def _as_uuid(value: Any) -> Optional[UUID]:
+    return value if isinstance(value, UUID) else UUID(str(value))
@@ -0,0 +1,96 @@
+"""
+Total-count strategies for product listings.
+
+Counting every match is often the most expensive part of a listing page,
+so each endpoint picks how much it needs:
+
+- ``exact``: a separate ``COUNT(*)``, cached under ``products_count`` with
+  its own TTL and tags, so every page and sort of the same filter set
+  shares one count.
+- ``estimate``: the Postgres planner's row estimate when it is large and
+  the filters are simple enough to estimate well; otherwise ``exact``.
+- ``has_more``: no total at all; the listing fetches ``limit + 1`` rows
+  and reports whether there is a next page.
+
+Whatever the strategy, a page that shows the end of the result set
+derives its exact total from its own rows without any count query.
+"""
+import enum
+import json
+from typing import Any, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import category_tag, response_cache
+from app.database import run_in_session
+
+CACHE_PREFIX = "products_count"
+
+
+class CountStrategy(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    HAS_MORE = "has_more"
+
+
+def _key_part(value: Any) -> Any:
+    if isinstance(value, (UUID, enum.Enum)):
+        return str(value)
+    return value
+
+
+async def exact_count(filters: dict[str, Any], fuzzy: bool = False) -> int:
+    """``count_products(**filters)``, cached per filter set until the next catalog write."""
+    from app.services.product_service import ProductService
+
+    key = (CACHE_PREFIX, fuzzy, *sorted((name, _key_part(value)) for name, value in filters.items()))
+    category_id = filters.get("category_id")
+    payload = await response_cache.get_or_set(
+        key,
+        lambda: run_in_session(lambda session: ProductService(session).count_products(**filters, fuzzy=fuzzy)),
+        ttl_seconds=settings.product_count_cache_seconds,
+        stale_seconds=settings.product_count_cache_seconds // 5,
+        tags=[category_tag(category_id)] if category_id else (),
+    )
+    return json.loads(payload.body)
+
+
+async def planner_estimate(session: AsyncSession, query) -> Optional[int]:
+    """Rows the Postgres planner expects ``query`` to return, or None elsewhere."""
+    if session.bind.dialect.name != "postgresql":
+        return None
+    try:
+        sql = query.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+        # A failed statement aborts the whole transaction on Postgres; the
+        # savepoint rolls back just the EXPLAIN so the listing can go on.
+        async with session.begin_nested():
+            result = await session.execute(sa.text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    except Exception as exc:
+        print(f"Product counts: planner estimate failed: {exc}")
+        return None
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def total_count(
+    session: AsyncSession,
+    strategy: CountStrategy,
+    filters: dict[str, Any],
+    *,
+    fuzzy: bool = False,
+    estimate_query=None,
+) -> Optional[int]:
+    """Total for a listing under ``strategy``; None for ``has_more``."""
+    if strategy == CountStrategy.HAS_MORE:
+        return None
+    # Search predicates (full-text, trigram) are estimated poorly.
+    if strategy == CountStrategy.ESTIMATE and estimate_query is not None and not filters.get("search"):
+        estimate = await planner_estimate(session, estimate_query)
+        if estimate is not None and estimate >= settings.product_count_estimate_min_rows:
+            return estimate
+    return await exact_count(filters, fuzzy)
@@ -0,0 +1,181 @@
+"""
+Facet counts for product listings.
+
+For a listing's filter set: products per brand and per category, a price
+histogram over ``PRODUCT_FACET_PRICE_EDGES``, "N% off or more" discount
+counts and in/out of stock counts. All of them come from one statement
+rather than one GROUP BY per facet. On Postgres that is a GROUPING SETS
+query with one set per facet. Other databases run one UNION ALL
+statement, and the in-memory ``product_snapshot`` (when enabled) counts
+with a single mask. Results are cached per filter set under
+``products_facets`` until the next catalog write, so every page and sort
+of a listing shares them.
+"""
+import enum
+import json
+from typing import Any, Optional
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.core.cache import category_tag, response_cache
+from app.database import run_in_session
+from app.models.brand import Brand
+from app.models.product import ProductCategory, ProductFacets
+from app.services.category_registry import category_registry
+
+CACHE_PREFIX = "products_facets"
+FACETS = ("brand", "category", "price", "discount", "stock")
+# Thresholds of the "N% off or more" facet.
+DISCOUNT_STEPS = (10, 20, 30, 40, 50, 60, 70)
+
+
+def bucket_sql(column, edges) -> Any:
+    """Bucket index of ``column``: how many of the ascending ``edges`` are <= it."""
+    # Indexes are inlined so the CASE is typed as an integer everywhere.
+    if not edges:
+        return sa.literal_column("0")
+    return sa.case(
+        *((column < edge, sa.literal_column(str(index))) for index, edge in enumerate(edges)),
+        else_=sa.literal_column(str(len(edges))),
+    )
+
+
+def facet_query(filtered, dialect: str):
+    """
+    Facet counts over ``filtered``, a subquery with ``id``, ``brand_id`` and
+    the ``price``, ``discount`` and ``stock`` bucket columns.
+    """
+    keys = {
+        "brand": filtered.c.brand_id,
+        "category": ProductCategory.category_id,
+        "price": filtered.c.price,
+        "discount": filtered.c.discount,
+        "stock": filtered.c.stock,
+    }
+    joined = filtered.outerjoin(ProductCategory, ProductCategory.product_id == filtered.c.id)
+    if dialect == "postgresql":
+        # grouping() is 0 for the columns of the set a row was grouped by.
+        return (
+            select(
+                *(key.label(name) for name, key in keys.items()),
+                *(sa.func.grouping(key).label(f"grouping_{name}") for name, key in keys.items()),
+                sa.func.count(sa.distinct(filtered.c.id)).label("count"),
+            )
+            .select_from(joined)
+            .group_by(sa.func.grouping_sets(*keys.values()))
+        )
+    return sa.union_all(*(
+        select(
+            sa.literal(name).label("facet"),
+            sa.cast(key, sa.String).label("key"),
+            sa.func.count(sa.distinct(filtered.c.id)).label("count"),
+        )
+        .select_from(joined if name == "category" else filtered)
+        .group_by(key)
+        for name, key in keys.items()
+    ))
+
+
+def _facet_key(facet: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if facet in ("brand", "category"):
+        return value if isinstance(value, UUID) else UUID(str(value))
+    return int(value)
+
+
+def read_facet_rows(rows, dialect: str) -> dict[str, dict[Any, int]]:
+    """``{facet: {key: count}}`` from ``facet_query`` rows; null brands/categories are dropped."""
+    counts: dict[str, dict[Any, int]] = {facet: {} for facet in FACETS}
+    for row in rows:
+        if dialect == "postgresql":
+            facet = next((name for name in FACETS if getattr(row, f"grouping_{name}") == 0), None)
+            value = getattr(row, facet) if facet else None
+        else:
+            facet, value = row.facet, row.key
+        key = _facet_key(facet, value) if facet else None
+        if key is not None:
+            counts[facet][key] = int(row.count)
+    return counts
+
+
+def is_empty(counts: dict[str, dict[Any, int]]) -> bool:
+    return not any(counts["stock"].values())
+
+
+async def describe(session: AsyncSession, counts: dict[str, dict[Any, int]]) -> ProductFacets:
+    """Named, ordered facets for raw ``counts``."""
+    brands = []
+    if counts["brand"]:
+        result = await session.execute(
+            select(Brand.id, Brand.name, Brand.slug).where(Brand.id.in_(list(counts["brand"])))
+        )
+        brands = [
+            {"id": row.id, "name": row.name, "slug": row.slug, "count": counts["brand"][row.id]}
+            for row in result.all()
+        ]
+    categories = []
+    registry = await category_registry.current(session)
+    for category_id, count in counts["category"].items():
+        item = registry.by_id.get(category_id)
+        if item is not None:
+            categories.append({"id": category_id, "name": item["name"], "slug": item["slug"], "count": count})
+
+    edges = settings.product_facet_price_edges
+    price_ranges = [
+        {
+            "min": edges[index - 1] if index else 0,
+            "max": edges[index] if index < len(edges) else None,
+            "count": counts["price"].get(index, 0),
+        }
+        for index in range(len(edges) + 1)
+    ]
+    # Bucket b holds discounts in [step b-1, step b): "at least step j" is buckets j+1 and up.
+    discounts = [
+        {
+            "min_discount": step,
+            "count": sum(count for bucket, count in counts["discount"].items() if bucket > index),
+        }
+        for index, step in enumerate(DISCOUNT_STEPS)
+    ]
+    return ProductFacets(
+        brands=sorted(brands, key=lambda item: (-item["count"], item["name"])),
+        categories=sorted(categories, key=lambda item: (-item["count"], item["name"])),
+        price_ranges=price_ranges,
+        discounts=discounts,
+        in_stock=counts["stock"].get(1, 0),
+        out_of_stock=counts["stock"].get(0, 0),
+    )
+
+
+def _key_part(value: Any) -> Any:
+    if isinstance(value, (UUID, enum.Enum)):
+        return str(value)
+    return value
+
+
+async def cached_facets(filters: dict[str, Any], fuzzy: bool = False) -> dict[str, Any]:
+    """JSON-ready ``ProductFacets`` for ``filters``, cached per filter set until the next catalog write."""
+    from app.services.product_service import ProductService
+
+    async def build(session: AsyncSession) -> dict[str, Any]:
+        counts = await ProductService(session).facet_counts(**filters, fuzzy=fuzzy)
+        # Like the listing, a search that matches nothing retries fuzzily.
+        if is_empty(counts) and filters.get("search") and not fuzzy and settings.product_fuzzy_fallback:
+            counts = await ProductService(session).facet_counts(**filters, fuzzy=True)
+        return (await describe(session, counts)).model_dump(mode="json")
+
+    key = (CACHE_PREFIX, fuzzy, *sorted((name, _key_part(value)) for name, value in filters.items()))
+    category_id: Optional[Any] = filters.get("category_id")
+    payload = await response_cache.get_or_set(
+        key,
+        lambda: run_in_session(build),
+        ttl_seconds=settings.product_facet_cache_seconds,
+        stale_seconds=settings.product_facet_cache_seconds // 5,
+        tags=[category_tag(category_id)] if category_id else (),
+    )
+    return json.loads(payload.body)
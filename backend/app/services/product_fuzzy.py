@@ -0,0 +1,258 @@
+"""
+Typo-tolerant product search by trigram similarity.
+
+Shoppers misspell brand and shade names ("maybelin", "lakme" for
+"Lakmé"), which full-text search can't match. Fuzzy search compares
+accent-folded trigrams of each query word against the words of product
+and brand names instead.
+
+Postgres uses ``pg_trgm`` word similarity over a GIN trigram index on the
+folded product name. Elsewhere (SQLite, or a Postgres without the
+extensions) an in-process trigram index over the active catalog is used.
+Its lookups walk trigram posting lists over the distinct-word vocabulary
+rather than over products, so they stay fast on a 100k-product catalog.
+
+Once built, the index is never refreshed on the query path: a stale one
+(catalog version moved, or older than ``CATALOG_INDEX_MAX_AGE_SECONDS``)
+keeps answering while a background task reads the products whose
+``updated_at`` moved since the last refresh and re-indexes the texts it
+holds in memory off the event loop.
+"""
+import asyncio
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import or_, select
+
+from app.config import settings
+from app.core.catalog_version import catalog_version
+from app.database import run_in_session
+from app.models.brand import Brand
+from app.models.product import Product
+from app.services.product_search import MAX_TOKENS, search_tokens
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+    "CREATE EXTENSION IF NOT EXISTS unaccent;",
+    # unaccent() is only STABLE; index expressions need an IMMUTABLE wrapper.
+    """
+    CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT unaccent('unaccent'::regdictionary, $1) $$;
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING GIN (immutable_unaccent(lower(name)) gin_trgm_ops);",
+]
+
+# Dialect whose trigram schema is in place, or None to use the in-process index.
+_backend: Optional[str] = None
+# Deltas overlap the previous refresh so a write timestamped just before it
+# but committed after it is not missed.
+SINCE_OVERLAP = timedelta(seconds=60)
+
+
+def fold(text: Optional[str]) -> str:
+    """Lowercase and strip accents, so "Lakmé" and "lakme" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def trigrams(word: str) -> set[str]:
+    """pg_trgm-style trigrams: the word padded with two leading blanks and one trailing."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+async def ensure_fuzzy_schema(conn) -> None:
+    """Create the trigram index on Postgres (idempotent); other databases need nothing."""
+    global _backend
+    if conn.dialect.name != "postgresql":
+        return
+    try:
+        for sql in POSTGRES_DDL:
+            await conn.execute(sa.text(sql))
+    except Exception as e:
+        print(f"Database: pg_trgm unavailable, using in-process fuzzy search: {e}")
+        return
+    _backend = "postgresql"
+
+
+class TrigramIndex:
+    """Trigram posting lists over the distinct words of the catalog."""
+
+    def __init__(self) -> None:
+        self.version: Optional[int] = None
+        self._product_ids: list[Any] = []
+        self._word_sizes: list[int] = []
+        self._word_products: list[list[int]] = []
+        self._postings: dict[str, list[int]] = {}
+        self._lock = asyncio.Lock()
+        # Active products as (name, brand_id), caught up from updated_at deltas.
+        self._products: dict[Any, tuple[str, Any]] = {}
+        self._synced_at: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def build(self, rows: Iterable[tuple[Any, str]], version: Optional[int] = None) -> None:
+        """Index ``(product_id, text)`` rows, replacing the previous contents."""
+        product_ids: list[Any] = []
+        word_ids: dict[str, int] = {}
+        word_sizes: list[int] = []
+        word_products: list[list[int]] = []
+        postings: dict[str, list[int]] = defaultdict(list)
+        for product_id, text in rows:
+            product = len(product_ids)
+            product_ids.append(product_id)
+            for word in set(_words(text)):
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = word_ids[word] = len(word_sizes)
+                    grams = trigrams(word)
+                    word_sizes.append(len(grams))
+                    word_products.append([])
+                    for gram in grams:
+                        postings[gram].append(word_id)
+                word_products[word_id].append(product)
+        # Swap in one go so searches never see a half-built index.
+        self._product_ids, self._word_sizes, self._word_products, self._postings = (
+            product_ids, word_sizes, word_products, dict(postings),
+        )
+        self.version = version
+
+    def search(self, query: str, threshold: float, limit: int) -> list[tuple[Any, float]]:
+        """
+        Products scored by the mean, over query words, of the best trigram
+        similarity to any of their words; those below ``threshold`` are dropped.
+        """
+        tokens = _words(query)[:MAX_TOKENS]
+        if not tokens:
+            return []
+        scores: dict[int, float] = defaultdict(float)
+        for token in tokens:
+            grams = trigrams(token)
+            shared = Counter(word_id for gram in grams for word_id in self._postings.get(gram, ()))
+            best: dict[int, float] = {}
+            for word_id, count in shared.items():
+                similarity = count / (len(grams) + self._word_sizes[word_id] - count)
+                if similarity < threshold:
+                    continue
+                for product in self._word_products[word_id]:
+                    if similarity > best.get(product, 0.0):
+                        best[product] = similarity
+            for product, similarity in best.items():
+                scores[product] += similarity / len(tokens)
+        ranked = sorted(
+            ((product, score) for product, score in scores.items() if score >= threshold),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return [(self._product_ids[product], round(score, 4)) for product, score in ranked[:limit]]
+
+    def _fresh(self) -> bool:
+        return (
+            self.version == catalog_version.value
+            and time.monotonic() - self._refreshed_at <= settings.catalog_index_max_age_seconds
+        )
+
+    async def current(self, session: AsyncSession) -> "TrigramIndex":
+        """
+        The index, built first if it never was; a stale one is returned as
+        is while a background refresh catches up.
+        """
+        if self.version is None:
+            await self.refresh(session)
+        elif not self._fresh() and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._refresh_in_background())
+        return self
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await run_in_session(self.refresh)
+        except Exception as exc:
+            print(f"Fuzzy index: background refresh failed: {exc}")
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Catch up with product writes since the last refresh and re-index if stale."""
+        async with self._lock:
+            if self._fresh():
+                return
+            version = catalog_version.value
+            query = select(Product.id, Product.name, Product.brand_id, Product.is_active, Product.updated_at)
+            if self._synced_at is None:
+                query = query.where(Product.is_active == True)
+            else:
+                query = query.where(Product.updated_at > self._synced_at - SINCE_OVERLAP)
+            for row in (await session.execute(query)).all():
+                if row.is_active:
+                    self._products[row.id] = (row.name, row.brand_id)
+                else:
+                    self._products.pop(row.id, None)
+                if row.updated_at and (self._synced_at is None or row.updated_at > self._synced_at):
+                    self._synced_at = row.updated_at
+            # Brands are few; reading them all picks up renames.
+            brands = dict((await session.execute(select(Brand.id, Brand.name))).all())
+            rows = [
+                (product_id, f"{name} {brands.get(brand_id) or ''}")
+                for product_id, (name, brand_id) in self._products.items()
+            ]
+            # Tokenizing a large catalog takes a moment; keep it off the event loop.
+            await asyncio.to_thread(self.build, rows, version)
+            self._refreshed_at = time.monotonic()
+
+
+def _words(text: Optional[str]) -> list[str]:
+    return search_tokens(fold(text))
+
+
+trigram_index = TrigramIndex()
+
+
+async def warm_trigram_index() -> None:
+    """Catch the in-process index up after catalog writes, once fuzzy search has used it."""
+    if _backend != "postgresql" and trigram_index.version is not None:
+        await run_in_session(trigram_index.refresh)
+
+
+@dataclass
+class FuzzyMatch:
+    """WHERE clause and relevance expression for a fuzzy search."""
+    condition: Any
+    rank: Any
+
+
+async def fuzzy_match(session: AsyncSession, search: Optional[str]) -> Optional[FuzzyMatch]:
+    """Build the fuzzy clauses for ``search``, or None when it has no usable words."""
+    folded = " ".join(_words(search)[:MAX_TOKENS])
+    if not folded:
+        return None
+    threshold = settings.product_fuzzy_threshold
+
+    if _backend == "postgresql":
+        # Lets `<%` (and so the GIN index) apply the configured threshold;
+        # the setting is local to the current transaction.
+        await session.execute(
+            sa.text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(threshold)},
+        )
+        name = sa.func.immutable_unaccent(sa.func.lower(Product.name))
+        brand_ids = select(Brand.id).where(
+            sa.literal(folded).op("<%")(sa.func.immutable_unaccent(sa.func.lower(Brand.name)))
+        )
+        return FuzzyMatch(
+            condition=or_(sa.literal(folded).op("<%")(name), Product.brand_id.in_(brand_ids)),
+            rank=sa.func.word_similarity(folded, name),
+        )
+
+    index = await trigram_index.current(session)
+    matches = index.search(folded, threshold, settings.product_fuzzy_max_results)
+    if not matches:
+        return FuzzyMatch(condition=sa.false(), rank=sa.literal(0.0))
+    return FuzzyMatch(
+        condition=Product.id.in_([product_id for product_id, _ in matches]),
+        rank=sa.case(dict(matches), value=Product.id, else_=0.0),
+    )
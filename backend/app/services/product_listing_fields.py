@@ -0,0 +1,190 @@
+"""
+Stored listing columns on ``products``: ``discount_percent``,
+``primary_image_url`` and ``units_sold``.
+
+Listings used to compute ``(mrp - selling_price) / mrp * 100`` per row and
+run a correlated ``product_images`` subquery per row for the card image.
+Both are now stored on the product row. Every ORM write path that changes
+prices or images calls ``refresh_listing_fields`` before committing.
+``units_sold`` is kept by ``OrderService`` as orders are placed and
+cancelled. ``backfill_listing_fields`` runs on every startup, so it only
+fills rows still holding the column defaults; ``units_sold`` is counted from
+orders only when the startup migration has just added it.
+
+``listing_columns``/``listing_item`` are the card fields every listing
+selects and how a row becomes a ``ProductListRead``.
+"""
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.seller_branding import normalize_seller_name
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product, ProductImage, ProductListRead
+
+_CENT = Decimal("0.01")
+
+
+def discount_percent(mrp: Any, selling_price: Any) -> Decimal:
+    """Discount off MRP in percent, rounded to 2 places; 0 without a real discount."""
+    mrp = Decimal(str(mrp or 0))
+    selling_price = Decimal(str(selling_price or 0))
+    if mrp <= 0 or selling_price >= mrp:
+        return Decimal("0")
+    return ((mrp - selling_price) * 100 / mrp).quantize(_CENT)
+
+
+def discount_percent_sql():
+    """SQL twin of ``discount_percent`` over the ``products`` columns."""
+    return sa.case(
+        (
+            sa.and_(Product.mrp > 0, Product.selling_price < Product.mrp),
+            sa.func.round((Product.mrp - Product.selling_price) * 100 / Product.mrp, 2),
+        ),
+        else_=0,
+    )
+
+
+def gallery_image_sql():
+    """Correlated subquery for a product's first gallery image (primary first)."""
+    return (
+        select(ProductImage.image_url)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.is_primary.desc(), ProductImage.sort_order.asc(), ProductImage.created_at.asc())
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
+def units_sold_sql():
+    """Correlated subquery for a product's units on orders that are not cancelled."""
+    return (
+        select(sa.func.coalesce(sa.func.sum(OrderItem.quantity), 0))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(
+            OrderItem.product_id == Product.id,
+            OrderItem.is_cancelled == False,
+            Order.status != OrderStatus.CANCELLED,
+        )
+        .correlate(Product)
+        .scalar_subquery()
+    )
+
+
+def listing_columns() -> list[Any]:
+    """Columns a product card is built from, plus the keys every sort reads."""
+    return [
+        Product.id,
+        Product.name,
+        Product.slug,
+        Product.sku,
+        Product.short_description,
+        Product.mrp,
+        Product.selling_price,
+        Product.b2b_price,
+        Product.stock_quantity,
+        Product.gst_percentage,
+        Product.is_featured,
+        Product.category_id,
+        Product.category_ids,
+        Product.image_url,
+        sa.func.coalesce(Product.primary_image_url, Product.image_url).label("primary_image"),
+        Product.seller_id,
+        Product.seller_name,
+        Product.parent_id,
+        Product.created_at,
+        Product.discount_percent,
+        Product.units_sold,
+    ]
+
+
+def listing_item(row: Any) -> ProductListRead:
+    """``ProductListRead`` for a row selected with ``listing_columns``."""
+    return ProductListRead(
+        id=row.id,
+        name=row.name,
+        slug=row.slug,
+        sku=row.sku,
+        short_description=row.short_description,
+        mrp=row.mrp,
+        selling_price=row.selling_price,
+        b2b_price=row.b2b_price,
+        stock_quantity=row.stock_quantity,
+        gst_percentage=row.gst_percentage or 18,
+        is_featured=row.is_featured,
+        category_id=row.category_id,
+        category_ids=[str(item) for item in row.category_ids] if isinstance(row.category_ids, list) else [],
+        image_url=row.image_url,
+        primary_image=row.primary_image,
+        seller_id=row.seller_id,
+        seller_name=normalize_seller_name(row.seller_name),
+        parent_id=row.parent_id,
+    )
+
+
+async def refresh_listing_fields(session: AsyncSession, products: Iterable[Product]) -> None:
+    """Recompute the stored listing columns of ``products``; the caller commits."""
+    products = list(products)
+    if not products:
+        return
+    for product in products:
+        product.discount_percent = discount_percent(product.mrp, product.selling_price)
+
+    gallery: dict[Any, Optional[str]] = {}
+    without_url = [product.id for product in products if not product.image_url]
+    if without_url:
+        await session.flush()
+        result = await session.execute(
+            select(ProductImage.product_id, ProductImage.image_url)
+            .where(ProductImage.product_id.in_(without_url))
+            .order_by(ProductImage.is_primary.desc(), ProductImage.sort_order.asc(), ProductImage.created_at.asc())
+        )
+        for row in result.all():
+            gallery.setdefault(row.product_id, row.image_url)
+
+    for product in products:
+        product.primary_image_url = product.image_url or gallery.get(product.id)
+        session.add(product)
+
+
+async def backfill_listing_fields(conn, units_sold: bool = False) -> int:
+    """
+    Fill stored listing columns still at their defaults; returns rows updated.
+
+    Only unset rows are touched: a zero discount on a discounted price and a
+    missing card image. ``units_sold`` is recounted from orders only when
+    asked, i.e. when the column has just been added.
+    """
+    discount = discount_percent_sql()
+    primary_image = sa.func.coalesce(Product.image_url, gallery_image_sql())
+    result = await conn.execute(
+        sa.update(Product)
+        .where(sa.or_(
+            Product.discount_percent.is_(None),
+            sa.and_(Product.discount_percent == 0, Product.mrp > 0, Product.selling_price < Product.mrp),
+        ))
+        # Leave updated_at alone: nothing a client syncs has changed.
+        .values(discount_percent=discount, updated_at=Product.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.rowcount or 0
+    result = await conn.execute(
+        sa.update(Product)
+        .where(Product.primary_image_url.is_(None))
+        .where(sa.or_(Product.image_url.isnot(None), sa.exists().where(ProductImage.product_id == Product.id)))
+        .values(primary_image_url=primary_image, updated_at=Product.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    updated += result.rowcount or 0
+    if not units_sold:
+        return updated
+    result = await conn.execute(
+        sa.update(Product)
+        .values(units_sold=units_sold_sql(), updated_at=Product.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return updated + (result.rowcount or 0)
@@ -0,0 +1,159 @@
+"""
+Full-text product search.
+
+Postgres uses a weighted ``tsvector`` generated column with a GIN index
+(name > sku > short_description > description); SQLite uses an FTS5 table
+kept in sync by triggers. Every search token is prefix-matched, so partial
+words typed into the search box still hit. Until the search schema has been
+ensured at startup (or if it can't be), search falls back to the old
+per-token ILIKE match.
+"""
+import re
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlmodel import and_, or_
+
+from app.models.product import Product
+
+# Product names, SKUs and descriptions split into words the same way both
+# engines tokenize them; anything else (quotes, operators) is dropped.
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TOKENS = 8
+
+# bm25 column weights for SQLite, in products_fts column order.
+SQLITE_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(sku, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(short_description, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+    ) STORED;
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING GIN (search_vector);",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, sku, short_description, description,
+        content='products', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, sku, short_description, description)
+        VALUES (new.rowid, new.name, new.sku, new.short_description, new.description);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, sku, short_description, description)
+        VALUES ('delete', old.rowid, old.name, old.sku, old.short_description, old.description);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, sku, short_description, description)
+        VALUES ('delete', old.rowid, old.name, old.sku, old.short_description, old.description);
+        INSERT INTO products_fts (rowid, name, sku, short_description, description)
+        VALUES (new.rowid, new.name, new.sku, new.short_description, new.description);
+    END;
+    """,
+]
+
+# Dialect whose search schema is in place, or None to use ILIKE.
+_backend: Optional[str] = None
+
+
+def search_tokens(search: Optional[str]) -> list[str]:
+    return _TOKEN_RE.findall((search or "").lower())[:MAX_TOKENS]
+
+
+async def ensure_search_schema(conn) -> None:
+    """Create the full-text objects for the connected database (idempotent)."""
+    global _backend
+    dialect = conn.dialect.name
+    try:
+        if dialect == "postgresql":
+            for sql in POSTGRES_DDL:
+                await conn.execute(sa.text(sql))
+        elif dialect == "sqlite":
+            existed = (
+                await conn.execute(sa.text("SELECT 1 FROM sqlite_master WHERE name = 'products_fts'"))
+            ).first()
+            for sql in SQLITE_DDL:
+                await conn.execute(sa.text(sql))
+            if not existed:
+                await conn.execute(sa.text("INSERT INTO products_fts (products_fts) VALUES ('rebuild')"))
+        else:
+            return
+    except Exception as e:
+        print(f"Database: Full-text search unavailable, using ILIKE search: {e}")
+        return
+    _backend = dialect
+
+
+def _ilike_filter(tokens: list[str]):
+    return and_(
+        *(
+            or_(
+                Product.name.ilike(f"%{token}%"),
+                Product.description.ilike(f"%{token}%"),
+                Product.sku.ilike(f"%{token}%"),
+                Product.short_description.ilike(f"%{token}%"),
+            )
+            for token in tokens
+        )
+    )
+
+
+def _tsquery(tokens: list[str]):
+    return sa.func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+
+
+def _fts5_match(tokens: list[str]):
+    return sa.literal_column("products_fts").op("MATCH")(" ".join(f'"{token}"*' for token in tokens))
+
+
+def search_filter(search: Optional[str]):
+    """
+    WHERE clause matching ``search``; None for a blank search. Text with no
+    usable tokens (only punctuation) matches nothing.
+    """
+    tokens = search_tokens(search)
+    if not tokens:
+        return sa.false() if search and search.strip() else None
+    if _backend == "postgresql":
+        return sa.literal_column("products.search_vector").op("@@")(_tsquery(tokens))
+    if _backend == "sqlite":
+        matches = (
+            sa.select(sa.literal_column("rowid"))
+            .select_from(sa.table("products_fts"))
+            .where(_fts5_match(tokens))
+        )
+        return sa.literal_column("products.rowid").in_(matches)
+    return _ilike_filter(tokens)
+
+
+def search_rank(search: Optional[str]):
+    """Relevance of a product row for ``search`` (higher is better), or None."""
+    tokens = search_tokens(search)
+    if not tokens:
+        return None
+    if _backend == "postgresql":
+        return sa.func.ts_rank(sa.literal_column("products.search_vector"), _tsquery(tokens))
+    if _backend == "sqlite":
+        # bm25 is lower-is-better; negate it so both engines sort descending.
+        return (
+            sa.select(-sa.func.bm25(sa.literal_column("products_fts"), *SQLITE_WEIGHTS))
+            .select_from(sa.table("products_fts"))
+            .where(_fts5_match(tokens), sa.literal_column("products_fts.rowid") == sa.literal_column("products.rowid"))
+            .scalar_subquery()
+        )
+    return None
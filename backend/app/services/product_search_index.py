@@ -0,0 +1,139 @@
+"""
+Compact, delta-syncable product index for client-side instant search.
+
+The index is sent as a header frame followed by chunk frames of up to
+``CHUNK_SIZE`` rows each. A chunk is columnar: one array per field, with
+prices in paise (integers) and the low-cardinality text columns (SKU/HSN
+codes, seller names) sent as a small string table plus per-row indexes.
+
+The version is the newest ``products.updated_at`` in epoch milliseconds.
+A client holding version N asks for ``since=N`` and receives only rows
+changed after it: active products to upsert and the ids of deactivated
+ones to drop. Deltas overlap the previous sync by ``SINCE_OVERLAP`` so a
+write whose timestamp was taken just before N but committed after it is
+not missed; re-applying a row is harmless.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.seller_branding import normalize_seller_name
+from app.models.product import Product
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+FORMAT_VERSION = 1
+CHUNK_SIZE = 1000
+SINCE_OVERLAP = timedelta(seconds=60)
+
+FIELDS = ("id", "name", "slug", "sku", "selling_price", "mrp", "image", "short_description", "seller_name")
+# Columns sent as {"values": [...], "codes": [...]}.
+TABLE_FIELDS = ("sku", "seller_name")
+# Columns sent as integer paise.
+PRICE_FIELDS = ("selling_price", "mrp")
+
+
+def _to_version(value: Optional[datetime]) -> int:
+    if value is None:
+        return 0
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _from_version(version: int) -> datetime:
+    return datetime.fromtimestamp(version / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+async def current_version(session: AsyncSession) -> int:
+    result = await session.execute(select(func.max(Product.updated_at)))
+    return _to_version(result.scalar())
+
+
+def _string_table(values: list[Optional[str]]) -> dict[str, list]:
+    table: dict[Optional[str], int] = {}
+    codes = [table.setdefault(value, len(table)) for value in values]
+    return {"values": list(table), "codes": codes}
+
+
+def encode_chunk(rows: list[Any]) -> dict[str, Any]:
+    """Columnar frame for a batch of product rows; inactive rows become removals."""
+    active = [row for row in rows if row.is_active]
+    columns: dict[str, list] = {
+        "id": [str(row.id) for row in active],
+        "name": [row.name for row in active],
+        "slug": [row.slug for row in active],
+        "sku": [row.sku for row in active],
+        "selling_price": [int(round(row.selling_price * 100)) for row in active],
+        "mrp": [int(round(row.mrp * 100)) for row in active],
+        "image": [row.image_url for row in active],
+        "short_description": [row.short_description or "" for row in active],
+        "seller_name": [normalize_seller_name(row.seller_name) for row in active],
+    }
+    frame: dict[str, Any] = {"rows": len(active)}
+    for field in FIELDS:
+        frame[field] = _string_table(columns[field]) if field in TABLE_FIELDS else columns[field]
+    frame["removed"] = [str(row.id) for row in rows if not row.is_active]
+    return frame
+
+
+async def iter_frames(session: AsyncSession, since: Optional[int] = None) -> AsyncIterator[dict[str, Any]]:
+    """Header frame, then one frame per chunk of changed (or, without ``since``, all active) rows."""
+    version = await current_version(session)
+    yield {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "since": since,
+        "full": since is None,
+        "fields": list(FIELDS),
+        "string_tables": list(TABLE_FIELDS),
+        "price_scale": 100,
+    }
+
+    query = select(
+        Product.id,
+        Product.name,
+        Product.slug,
+        Product.sku,
+        Product.selling_price,
+        Product.mrp,
+        Product.image_url,
+        Product.short_description,
+        Product.seller_name,
+        Product.is_active,
+    )
+    if since is None:
+        query = query.where(Product.is_active == True)
+    else:
+        query = query.where(Product.updated_at > _from_version(since) - SINCE_OVERLAP)
+
+    result = await session.stream(query.execution_options(yield_per=CHUNK_SIZE))
+    async for rows in result.partitions(CHUNK_SIZE):
+        yield encode_chunk(rows)
+
+
+async def stream_json(frames: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """One JSON document, ``{"header": {...}, "chunks": [...]}``, written chunk by chunk."""
+    header = await frames.__anext__()
+    yield b'{"header":' + _dumps(header) + b',"chunks":['
+    first = True
+    async for frame in frames:
+        yield (b"" if first else b",") + _dumps(frame)
+        first = False
+    yield b"]}"
+
+
+async def stream_msgpack(frames: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """A stream of msgpack maps: the header, then one per chunk."""
+    packer = msgpack.Packer()
+    async for frame in frames:
+        yield packer.pack(frame)
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
@@ -1,19 +1,36 @@
 """
 Product Service - Product operations
 """
-from typing import Optional, Sequence
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import String, cast, func
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import select, or_
 from slugify import slugify
 
-from app.core.cache import response_cache
-from app.core.exceptions import ConflictException, NotFoundException
-from app.core.seller_branding import normalize_seller_name
+from app.config import settings
+from app.core.cache import category_tag, product_tag, response_cache
+from app.core.catalog_version import catalog_version, category_version
+from app.core.exceptions import BadRequestException, ConflictException, NotFoundException
+from app.core.pagination import decode_cursor, encode_cursor, keyset_after
+from app.models.order import OrderItem
 from app.models.product import Product, ProductCreate, ProductImage, ProductListRead, ProductUpdate
+from app.services import (
+    brand_stats,
+    category_covers,
+    product_categories,
+    product_counts,
+    product_facets,
+    product_fuzzy,
+    product_listing_fields,
+    product_search,
+)
+from app.services.product_snapshot import product_snapshot
+from app.services.product_counts import CountStrategy
+from app.services.product_sort import SORT_KEYS, ProductSort, SortKeys, with_rank
 
 
 class ProductService:
@@ -22,29 +39,62 @@ class ProductService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    # Cached views that aggregate over the whole catalog; any product write
+    # can change them.
+    CATALOG_CACHE_PREFIXES = (
+        "products_list",
+        "products_count",
+        "products_facets",
+        "products_featured",
+        "products_discounted_featured",
+        "products_brands_featured",
+        "products_brands",
+        "products_search_index",
+        "catalog_bootstrap",
+        "home_bootstrap",
+        "categories_list",
+        "categories_tree",
+    )
+
+    @classmethod
+    def _clear_public_product_cache(
+        cls,
+        product_ids: Iterable[UUID] = (),
+        category_ids: Iterable[UUID | str | None] = (),
+    ) -> None:
+        """
+        Invalidate public caches after a product write.
+
+        With no ids every per-product and per-category entry is dropped too;
+        otherwise only entries tagged with the given products/categories are.
+        """
+        product_ids = list(product_ids)
+        category_ids = [c for c in category_ids if c]
+        catalog_version.bump()
+        # Product writes can move category cover images.
+        category_version.bump()
+        response_cache.clear_prefix(*cls.CATALOG_CACHE_PREFIXES)
+        if not product_ids and not category_ids:
+            response_cache.clear_prefix("product_detail_bundle", "product_slug", "categories_slug")
+            return
+        response_cache.invalidate_tags(
+            *(product_tag(product_id) for product_id in product_ids),
+            *(category_tag(category_id) for category_id in category_ids),
+        )
+
     @staticmethod
-    def _clear_public_product_cache() -> None:
-        for prefix in (
-            "products_list",
-            "products_featured",
-            "products_brands_featured",
-            "products_brands",
-            "products_search_index",
-            "catalog_bootstrap",
-            "product_detail_bundle",
-            "product_slug",
-            "home_bootstrap",
-            "categories_list",
-            "categories_tree",
-            "categories_slug",
-        ):
-            response_cache.clear_prefix(prefix)
+    def _product_category_ids(product: Product) -> set:
+        ids = {str(c) for c in (product.category_ids or [])}
+        if product.category_id:
+            ids.add(str(product.category_id))
+        return ids
 
     def _apply_product_filters(
         self,
         query,
         *,
         category_id: Optional[UUID] = None,
+        include_descendants: bool = False,
         brand_id: Optional[UUID] = None,
         is_active: Optional[bool] = True,
         is_featured: Optional[bool] = None,
@@ -55,59 +105,50 @@ class ProductService:
         min_discount: Optional[float] = None,
         in_stock: Optional[bool] = None,
         seller_id: Optional[UUID] = None,
+        fuzzy_match: Optional[product_fuzzy.FuzzyMatch] = None,
     ):
         if is_active is not None:
             query = query.where(Product.is_active == is_active)
         if category_id:
-            cat_str = str(category_id)
-            query = query.where(
-                or_(
-                    Product.category_id == category_id,
-                    cast(Product.category_ids, String).contains(cat_str),
-                )
-            )
+            query = query.where(product_categories.in_category(category_id, include_descendants))
         if brand_id:
             query = query.where(Product.brand_id == brand_id)
         if is_featured is not None:
             query = query.where(Product.is_featured == is_featured)
         if is_discounted_featured is not None:
             query = query.where(Product.is_discounted_featured == is_discounted_featured)
-        if search:
-            tokens = [t.strip() for t in search.split() if t.strip()]
-            for token in tokens:
-                pattern = f"%{token}%"
-                query = query.where(
-                    or_(
-                        Product.name.ilike(pattern),
-                        Product.description.ilike(pattern),
-                        Product.sku.ilike(pattern),
-                        Product.short_description.ilike(pattern),
-                    )
-                )
+        if fuzzy_match is not None:
+            query = query.where(fuzzy_match.condition)
+        elif search:
+            condition = product_search.search_filter(search)
+            if condition is not None:
+                query = query.where(condition)
         if min_price is not None:
             query = query.where(Product.selling_price >= min_price)
         if max_price is not None:
             query = query.where(Product.selling_price <= max_price)
         if min_discount is not None:
-            query = query.where(Product.mrp > 0)
-            query = query.where(((Product.mrp - Product.selling_price) / Product.mrp * 100) >= min_discount)
+            query = query.where(Product.discount_percent >= min_discount)
         if in_stock is not None:
             query = query.where(Product.stock_quantity > 0 if in_stock else Product.stock_quantity <= 0)
         if seller_id is not None:
             query = query.where(Product.seller_id == seller_id)
         return query
 
-    @staticmethod
-    def _normalize_category_ids(value) -> list[str]:
-        if isinstance(value, list):
-            return [str(item) for item in value]
-        return []
+    # Keyset orderings: newest first, or relevance first when searching.
+    # An explicit sort is tagged with its own name (with FUZZY_SUFFIX
+    # after a fuzzy match, so later pages keep matching fuzzily).
+    ORDER_CREATED = "created"
+    ORDER_RANK = "rank"
+    ORDER_FUZZY = "fuzzy"
+    FUZZY_SUFFIX = ":fuzzy"
 
     async def list_product_summaries(
         self,
         skip: int = 0,
         limit: int = 20,
         category_id: Optional[UUID] = None,
+        include_descendants: bool = False,
         brand_id: Optional[UUID] = None,
         is_active: bool = True,
         is_featured: Optional[bool] = None,
@@ -119,44 +160,24 @@ class ProductService:
         in_stock: Optional[bool] = None,
         seller_id: Optional[UUID] = None,
         include_total: bool = False,
+        fuzzy: bool = False,
+        sort: ProductSort = ProductSort.RELEVANCE,
     ) -> tuple[list[ProductListRead], int | None]:
-        """List products with only card/listing fields and optional total count."""
-        primary_image = (
-            select(ProductImage.image_url)
-            .where(ProductImage.product_id == Product.id)
-            .order_by(ProductImage.is_primary.desc(), ProductImage.sort_order.asc(), ProductImage.created_at.asc())
-            .limit(1)
-            .correlate(Product)
-            .scalar_subquery()
-        )
-
-        columns = [
-            Product.id,
-            Product.name,
-            Product.slug,
-            Product.sku,
-            Product.short_description,
-            Product.mrp,
-            Product.selling_price,
-            Product.b2b_price,
-            Product.stock_quantity,
-            Product.gst_percentage,
-            Product.is_featured,
-            Product.category_id,
-            Product.category_ids,
-            Product.image_url,
-            func.coalesce(Product.image_url, primary_image).label("primary_image"),
-            Product.seller_id,
-            Product.seller_name,
-            Product.parent_id,
-        ]
-        if include_total:
-            columns.append(func.count(Product.id).over().label("total_count"))
-
-        query = select(*columns)
-        query = self._apply_product_filters(
-            query,
+        """
+        List products with only card/listing fields and optional total count.
+        By default results are newest first, or ordered by relevance with
+        ``search``; ``sort`` picks another ordering. ``fuzzy`` matches
+        misspellings by trigram similarity; an exact search that finds
+        nothing falls back to it automatically.
+        """
+        items, total, _ = await self.list_product_summaries_page(
+            skip=skip,
+            limit=limit,
+            count=CountStrategy.EXACT if include_total else None,
+            fuzzy=fuzzy,
+            sort=sort,
             category_id=category_id,
+            include_descendants=include_descendants,
             brand_id=brand_id,
             is_active=is_active,
             is_featured=is_featured,
@@ -168,52 +189,142 @@ class ProductService:
             in_stock=in_stock,
             seller_id=seller_id,
         )
-        query = query.order_by(Product.created_at.desc()).offset(skip).limit(limit)
+        return items, total
 
-        result = await self.session.execute(query)
-        rows = result.all()
-        items = [
-            ProductListRead(
-                id=row.id,
-                name=row.name,
-                slug=row.slug,
-                sku=row.sku,
-                short_description=row.short_description,
-                mrp=row.mrp,
-                selling_price=row.selling_price,
-                b2b_price=row.b2b_price,
-                stock_quantity=row.stock_quantity,
-                gst_percentage=row.gst_percentage or 18,
-                is_featured=row.is_featured,
-                category_id=row.category_id,
-                category_ids=self._normalize_category_ids(row.category_ids),
-                image_url=row.image_url,
-                primary_image=row.primary_image,
-                seller_id=row.seller_id,
-                seller_name=normalize_seller_name(row.seller_name),
-                parent_id=row.parent_id,
-            )
-            for row in rows
-        ]
-        if include_total and rows:
-            total = int(rows[0].total_count)
-        elif include_total and skip > 0:
-            total = await self.count_products(
-                category_id=category_id,
-                brand_id=brand_id,
-                is_active=is_active,
-                is_featured=is_featured,
-                is_discounted_featured=is_discounted_featured,
-                search=search,
-                min_price=min_price,
-                max_price=max_price,
-                min_discount=min_discount,
-                in_stock=in_stock,
-                seller_id=seller_id,
+    async def list_product_summaries_page(
+        self,
+        *,
+        limit: int = 20,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountStrategy] = None,
+        fuzzy: bool = False,
+        sort: ProductSort = ProductSort.RELEVANCE,
+        **filters,
+    ) -> tuple[list[ProductListRead], int | None, Optional[str]]:
+        """
+        ``list_product_summaries`` plus a cursor for the next page.
+
+        Pass the returned cursor back instead of ``skip`` to read the next
+        page as an index range on the sort key (see ``product_sort``; the
+        relevance rank goes in front when searching) rather than an OFFSET
+        scan. A cursor only continues the sort it was issued for. The cursor
+        is None on the last page, which doubles as a ``has_more`` flag.
+
+        ``count`` picks how the total is obtained (see ``product_counts``);
+        it is None without a strategy, for ``has_more`` and in cursor mode.
+
+        Listings the in-memory ``product_snapshot`` can serve are answered
+        from it when it is enabled; the rest run the SQL query.
+        """
+        search = filters.get("search")
+        after = None
+        if cursor:
+            ordering, after = decode_cursor(cursor, *self._summary_orderings(search, fuzzy, sort))
+            # Pages after a fuzzy fallback stay fuzzy.
+            fuzzy = self._is_fuzzy_ordering(ordering)
+            skip, count = 0, None
+
+        fuzzy_match = await product_fuzzy.fuzzy_match(self.session, search) if fuzzy else None
+        rank = None
+        if sort == ProductSort.RELEVANCE:
+            rank = fuzzy_match.rank if fuzzy_match is not None else product_search.search_rank(search)
+        sort_keys = SORT_KEYS[sort]
+        if rank is not None:
+            sort_keys = with_rank(sort_keys, rank)
+        columns = product_listing_fields.listing_columns()
+        if rank is not None:
+            columns.append(rank.label("search_rank"))
+
+        after_values = self._parse_cursor(sort_keys, after) if after is not None else None
+        matched = None
+        if (
+            rank is None
+            and fuzzy_match is None
+            and product_snapshot.enabled()
+            and product_snapshot.can_serve(sort_keys, filters)
+        ):
+            snapshot = await product_snapshot.current(self.session)
+            rows, matched = snapshot.page(sort_keys, after_values, skip, limit, filters)
+        else:
+            query = select(*columns)
+            query = self._apply_product_filters(query, **filters, fuzzy_match=fuzzy_match)
+            if after_values is not None:
+                query = query.where(keyset_after(sort_keys.columns, after_values, sort_keys.descending))
+            # One extra row tells whether there is a next page.
+            query = query.order_by(*sort_keys.order_by()).offset(skip).limit(limit + 1)
+
+            result = await self.session.execute(query)
+            rows = result.all()
+        if (
+            not rows
+            and search
+            and not fuzzy
+            and after is None
+            and settings.product_fuzzy_fallback
+            and (skip == 0 or not await product_counts.exact_count(filters))
+        ):
+            return await self.list_product_summaries_page(
+                limit=limit, skip=skip, count=count, fuzzy=True, sort=sort, **filters
             )
+
+        has_more = len(rows) > limit
+        next_cursor = None
+        if has_more:
+            rows = rows[:limit]
+            last = rows[-1]
+            ordering = self._summary_orderings(search, fuzzy, sort)[0]
+            values = [getattr(last, column.key) for column in SORT_KEYS[sort].columns]
+            if rank is not None:
+                values.insert(0, last.search_rank)
+            next_cursor = encode_cursor(ordering, values)
+
+        items = [product_listing_fields.listing_item(row) for row in rows]
+        if count is None or count == CountStrategy.HAS_MORE:
+            total = None
+        elif not has_more and (rows or skip == 0):
+            # This page reaches the end of the results: the total is exact for free.
+            total = skip + len(rows)
+        elif matched is not None:
+            # The snapshot counted every match while filtering.
+            total = matched
         else:
-            total = 0 if include_total else None
-        return items, total
+            total = await self.total_products(count, fuzzy=fuzzy, **filters)
+            # Never report fewer rows than this page proves exist.
+            if rows:
+                total = max(total, skip + len(rows) + (1 if has_more else 0))
+        return items, total, next_cursor
+
+    @classmethod
+    def _summary_orderings(
+        cls,
+        search: Optional[str],
+        fuzzy: bool,
+        sort: ProductSort = ProductSort.RELEVANCE,
+    ) -> tuple[str, ...]:
+        """Orderings a listing can be paged in; the first is the one it starts with."""
+        searching = bool(product_search.search_tokens(search))
+        if sort == ProductSort.RELEVANCE and searching:
+            if fuzzy:
+                return (cls.ORDER_FUZZY,)
+            return (cls.ORDER_RANK, cls.ORDER_FUZZY)
+        base = cls.ORDER_CREATED if sort in (ProductSort.RELEVANCE, ProductSort.NEWEST) else sort.value
+        if not searching:
+            return (base,)
+        if fuzzy:
+            return (base + cls.FUZZY_SUFFIX,)
+        return (base, base + cls.FUZZY_SUFFIX)
+
+    @classmethod
+    def _is_fuzzy_ordering(cls, ordering: str) -> bool:
+        return ordering == cls.ORDER_FUZZY or ordering.endswith(cls.FUZZY_SUFFIX)
+
+    @staticmethod
+    def _parse_cursor(keys: SortKeys, values: list) -> tuple:
+        try:
+            return keys.parse(values)
+        except (TypeError, ValueError, ArithmeticError):
+            raise BadRequestException("Invalid pagination cursor")
 
     async def get_product_by_id(self, product_id: UUID) -> Product:
         """Get product by ID or raise exception."""
@@ -244,6 +355,7 @@ class ProductService:
         skip: int = 0,
         limit: int = 20,
         category_id: Optional[UUID] = None,
+        include_descendants: bool = False,
         brand_id: Optional[UUID] = None,
         is_active: bool = True,
         is_featured: Optional[bool] = None,
@@ -253,13 +365,19 @@ class ProductService:
         max_price: Optional[float] = None,
         min_discount: Optional[float] = None,
         in_stock: Optional[bool] = None,
-        seller_id: Optional[UUID] = None
+        seller_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
     ) -> list[Product]:
-        """List products with filters. Pass seller_id to restrict to that seller's products."""
+        """
+        List products with filters. Pass seller_id to restrict to that seller's products.
+        With ``cursor`` (see ``product_cursor``) the page starts after that product
+        instead of at ``skip``.
+        """
         query = select(Product).options(selectinload(Product.images))
         query = self._apply_product_filters(
             query,
             category_id=category_id,
+            include_descendants=include_descendants,
             brand_id=brand_id,
             is_active=is_active,
             is_featured=is_featured,
@@ -271,14 +389,35 @@ class ProductService:
             in_stock=in_stock,
             seller_id=seller_id,
         )
-        query = query.offset(skip).limit(limit).order_by(Product.created_at.desc())
+        if cursor:
+            _, after = decode_cursor(cursor, self.ORDER_CREATED)
+            newest = SORT_KEYS[ProductSort.NEWEST]
+            query = query.where(keyset_after(newest.columns, self._parse_cursor(newest, after)))
+            skip = 0
+        query = query.offset(skip).limit(limit).order_by(Product.created_at.desc(), Product.id.desc())
 
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    @classmethod
+    def product_cursor(cls, product: Product) -> str:
+        """Cursor for the ``list_products`` page following ``product``."""
+        return encode_cursor(cls.ORDER_CREATED, [product.created_at, product.id])
     
+    async def total_products(self, count: CountStrategy, fuzzy: bool = False, **filters) -> Optional[int]:
+        """Total for a listing with ``filters`` under the ``count`` strategy (None for has_more)."""
+        return await product_counts.total_count(
+            self.session,
+            count,
+            filters,
+            fuzzy=fuzzy,
+            estimate_query=self._apply_product_filters(select(Product.id), **filters),
+        )
+
     async def count_products(
         self,
         category_id: Optional[UUID] = None,
+        include_descendants: bool = False,
         brand_id: Optional[UUID] = None,
         is_active: bool = True,
         is_featured: Optional[bool] = None,
@@ -288,13 +427,16 @@ class ProductService:
         max_price: Optional[float] = None,
         min_discount: Optional[float] = None,
         in_stock: Optional[bool] = None,
-        seller_id: Optional[UUID] = None
+        seller_id: Optional[UUID] = None,
+        fuzzy: bool = False,
     ) -> int:
         """Count products with filters."""
+        fuzzy_match = await product_fuzzy.fuzzy_match(self.session, search) if fuzzy else None
         query = select(func.count(Product.id))
         query = self._apply_product_filters(
             query,
             category_id=category_id,
+            include_descendants=include_descendants,
             brand_id=brand_id,
             is_active=is_active,
             is_featured=is_featured,
@@ -305,11 +447,34 @@ class ProductService:
             min_discount=min_discount,
             in_stock=in_stock,
             seller_id=seller_id,
+            fuzzy_match=fuzzy_match,
         )
 
         result = await self.session.execute(query)
         return result.scalar() or 0
     
+    async def facet_counts(self, fuzzy: bool = False, **filters) -> dict:
+        """
+        ``{facet: {key: count}}`` for the products matching ``filters``, in
+        one statement (see ``product_facets``) or from the snapshot.
+        """
+        if not fuzzy and product_snapshot.enabled() and product_snapshot.can_filter(filters):
+            snapshot = await product_snapshot.current(self.session)
+            return snapshot.facet_counts(filters, settings.product_facet_price_edges, product_facets.DISCOUNT_STEPS)
+
+        fuzzy_match = await product_fuzzy.fuzzy_match(self.session, filters.get("search")) if fuzzy else None
+        query = select(
+            Product.id,
+            Product.brand_id,
+            product_facets.bucket_sql(Product.selling_price, settings.product_facet_price_edges).label("price"),
+            product_facets.bucket_sql(Product.discount_percent, product_facets.DISCOUNT_STEPS).label("discount"),
+            product_facets.bucket_sql(Product.stock_quantity, (1,)).label("stock"),
+        )
+        query = self._apply_product_filters(query, **filters, fuzzy_match=fuzzy_match)
+        dialect = self.session.bind.dialect.name
+        result = await self.session.execute(product_facets.facet_query(query.subquery(), dialect))
+        return product_facets.read_facet_rows(result.all(), dialect)
+
     async def get_product_variants(self, slug: str) -> Sequence[Product]:
         """Get all sibling products including the parent product."""
         # Lightweight query just to find the parent_id
@@ -334,6 +499,36 @@ class ProductService:
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def list_popular_slugs(self, limit: int = 20, days: int = 30) -> list[str]:
+        """Slugs of the best-selling active products, topped up with featured ones."""
+        since = datetime.utcnow() - timedelta(days=days)
+        result = await self.session.execute(
+            select(Product.slug)
+            .join(OrderItem, OrderItem.product_id == Product.id)
+            .where(
+                Product.is_active == True,
+                OrderItem.is_cancelled == False,
+                OrderItem.created_at >= since,
+            )
+            .group_by(Product.id, Product.slug)
+            .order_by(func.sum(OrderItem.quantity).desc())
+            .limit(limit)
+        )
+        slugs = list(result.scalars().all())
+        if len(slugs) < limit:
+            featured = await self.session.execute(
+                select(Product.slug)
+                .where(
+                    Product.is_active == True,
+                    Product.is_featured == True,
+                    Product.slug.notin_(slugs),
+                )
+                .order_by(Product.created_at.desc())
+                .limit(limit - len(slugs))
+            )
+            slugs.extend(featured.scalars().all())
+        return slugs
+
     async def create_product(self, data: ProductCreate) -> Product:
         """Create a new product."""
 
@@ -364,9 +559,17 @@ class ProductService:
         )
         
         self.session.add(product)
+        await product_categories.sync_product_categories(self.session, [product])
+        await product_listing_fields.refresh_listing_fields(self.session, [product])
+        await self.session.flush()
+        await brand_stats.refresh_brand_stats(self.session, [product.brand_id])
+        await category_covers.refresh_category_covers(self.session, self._product_category_ids(product))
         await self.session.commit()
         await self.session.refresh(product)
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(
+            product_ids=[product.id, product.parent_id] if product.parent_id else [product.id],
+            category_ids=self._product_category_ids(product),
+        )
 
         # Load relationships for response model
         result = await self.session.execute(
@@ -377,6 +580,9 @@ class ProductService:
     async def update_product(self, product_id: UUID, data: ProductUpdate) -> Product:
         """Update a product."""
         product = await self.get_product_by_id(product_id)
+        previous_category_ids = self._product_category_ids(product)
+        previous_parent_id = product.parent_id
+        previous_brand_id = product.brand_id
         
         update_data = data.model_dump(exclude_unset=True)
         
@@ -392,9 +598,20 @@ class ProductService:
             setattr(product, field, value)
         
         self.session.add(product)
+        if self._product_category_ids(product) != previous_category_ids:
+            await product_categories.sync_product_categories(self.session, [product])
+        await product_listing_fields.refresh_listing_fields(self.session, [product])
+        await self.session.flush()
+        await brand_stats.refresh_brand_stats(self.session, {previous_brand_id, product.brand_id})
+        await category_covers.refresh_category_covers(
+            self.session, previous_category_ids | self._product_category_ids(product)
+        )
         await self.session.commit()
         await self.session.refresh(product)
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(
+            product_ids=[pid for pid in (product.id, previous_parent_id, product.parent_id) if pid],
+            category_ids=previous_category_ids | self._product_category_ids(product),
+        )
 
         # Load relationships for response model
         result = await self.session.execute(
@@ -412,12 +629,21 @@ class ProductService:
                 or_(Product.id == root_id, Product.parent_id == root_id)
             )
         )
+        touched_ids: list[UUID] = []
+        touched_category_ids: set = set()
+        touched_brand_ids: set = set()
         for item in result.scalars().all():
             item.is_active = False
             self.session.add(item)
+            touched_ids.append(item.id)
+            touched_category_ids |= self._product_category_ids(item)
+            touched_brand_ids.add(item.brand_id)
 
+        await self.session.flush()
+        await brand_stats.refresh_brand_stats(self.session, touched_brand_ids)
+        await category_covers.refresh_category_covers(self.session, touched_category_ids)
         await self.session.commit()
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(product_ids=touched_ids, category_ids=touched_category_ids)
 
     async def bulk_delete_products(self, product_ids: list[UUID]) -> int:
         """Soft delete multiple products, expanding each to its variant group."""
@@ -430,6 +656,9 @@ class ProductService:
             root_ids.add(product.parent_id or product.id)
 
         deactivated = 0
+        touched_ids: list[UUID] = []
+        touched_category_ids: set = set()
+        touched_brand_ids: set = set()
         for root_id in root_ids:
             result = await self.session.execute(
                 select(Product).where(
@@ -441,9 +670,15 @@ class ProductService:
                     deactivated += 1
                 item.is_active = False
                 self.session.add(item)
+                touched_ids.append(item.id)
+                touched_category_ids |= self._product_category_ids(item)
+                touched_brand_ids.add(item.brand_id)
 
+        await self.session.flush()
+        await brand_stats.refresh_brand_stats(self.session, touched_brand_ids)
+        await category_covers.refresh_category_covers(self.session, touched_category_ids)
         await self.session.commit()
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(product_ids=touched_ids, category_ids=touched_category_ids)
         return deactivated
     
     async def add_product_image(
@@ -491,9 +726,14 @@ class ProductService:
         )
         
         self.session.add(image)
+        await product_listing_fields.refresh_listing_fields(self.session, [product])
+        await category_covers.refresh_category_covers(self.session, self._product_category_ids(product))
         await self.session.commit()
         await self.session.refresh(image)
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(
+            product_ids=[product_id],
+            category_ids=self._product_category_ids(product),
+        )
         
         return image
     
@@ -507,9 +747,15 @@ class ProductService:
         if not image:
             raise NotFoundException("Image")
         
+        product = await self.session.get(Product, image.product_id)
+        category_ids = self._product_category_ids(product) if product else set()
+        product_id = image.product_id
         await self.session.delete(image)
+        if product:
+            await product_listing_fields.refresh_listing_fields(self.session, [product])
+            await category_covers.refresh_category_covers(self.session, category_ids)
         await self.session.commit()
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(product_ids=[product_id], category_ids=category_ids)
     
     async def update_stock(self, product_id: UUID, quantity_change: int) -> Product:
         """Update product stock quantity."""
@@ -522,6 +768,6 @@ class ProductService:
         self.session.add(product)
         await self.session.commit()
         await self.session.refresh(product)
-        self._clear_public_product_cache()
+        self._clear_public_product_cache(product_ids=[product.id])
         
         return product
@@ -0,0 +1,361 @@
+"""
+Opt-in in-memory columnar snapshot of the active catalog.
+
+With ``PRODUCT_SNAPSHOT_ENABLED`` (and numpy installed) every worker keeps
+the active products as column arrays: price, MRP, discount, stock, units
+sold and created_at, brand and seller codes, the listing flags, and one
+membership bitmap per category. A listing it can serve (active products,
+no search text, any sort but ``name``) is a handful of vectorized masks
+and a sort of the matches, and only the rows of the returned page become
+``ProductListRead`` objects. Everything else goes to SQL as before; so
+does ``name``, whose order depends on the database collation.
+
+The snapshot tracks the catalog version, and refreshes anyway once it is
+older than ``CATALOG_INDEX_MAX_AGE_SECONDS`` so workers that miss a version
+bump still converge. A refresh re-reads only the products whose
+``updated_at`` moved since the last one (overlapping by ``SINCE_OVERLAP``
+like the search index delta), their category memberships and the category
+closure, rebuilds the arrays off the event loop and swaps them in as one
+reference, so readers always see a complete snapshot.
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.core.catalog_version import catalog_version
+from app.models.category import CategoryClosure
+from app.models.product import Product, ProductCategory
+from app.services.product_listing_fields import listing_columns
+from app.services.product_sort import SortKeys
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+SINCE_OVERLAP = timedelta(seconds=60)
+# Above this many changed products, reload every membership row instead of
+# filtering by product id.
+MEMBERSHIP_DELTA_LIMIT = 2000
+# Sorts whose matches outnumber the page window by this factor first cut
+# the candidates down with a partial sort.
+PARTITION_FACTOR = 4
+
+# Listing filters the snapshot can evaluate; any other non-None filter
+# sends the request to SQL.
+SUPPORTED_FILTERS = frozenset({
+    "category_id",
+    "include_descendants",
+    "brand_id",
+    "is_active",
+    "is_featured",
+    "is_discounted_featured",
+    "search",
+    "min_price",
+    "max_price",
+    "min_discount",
+    "in_stock",
+    "seller_id",
+})
+# Sort key column -> snapshot array.
+KEY_ARRAYS = {
+    "created_at": "created_at",
+    "selling_price": "selling_price",
+    "discount_percent": "discount",
+    "units_sold": "units_sold",
+}
+
+
+def _uuid(value: Any) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+def _key_value(value: Any) -> float:
+    if isinstance(value, datetime):
+        return float(np.datetime64(value.replace(tzinfo=None), "us").astype(np.int64))
+    return float(value)
+
+
+@dataclass(frozen=True)
+class SnapshotColumns:
+    """Active products at one catalog version; every array is aligned with ``rows``."""
+    version: int
+    rows: list[Any]
+    # Position of each id in UUID order, the tie-break every sort ends with.
+    id_rank: Any
+    sorted_ids: list[int]
+    created_at: Any
+    selling_price: Any
+    mrp: Any
+    discount: Any
+    stock: Any
+    units_sold: Any
+    is_featured: Any
+    is_discounted_featured: Any
+    brand: Any
+    seller: Any
+    brand_codes: dict[UUID, int]
+    seller_codes: dict[UUID, int]
+    categories: dict[UUID, Any]
+    subtrees: dict[UUID, list[UUID]]
+    built_at: float = 0.0
+
+    @classmethod
+    def build(
+        cls,
+        records: dict[UUID, Any],
+        memberships: dict[UUID, set[UUID]],
+        subtrees: dict[UUID, list[UUID]],
+        version: int,
+    ) -> "SnapshotColumns":
+        rows = list(records.values())
+        ids = [row.id.int for row in rows]
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        id_rank = np.empty(len(ids), dtype=np.float64)
+        id_rank[order] = np.arange(len(ids), dtype=np.float64)
+
+        brand_codes: dict[UUID, int] = {}
+        seller_codes: dict[UUID, int] = {}
+        brand = np.array([brand_codes.setdefault(r.brand_id, len(brand_codes)) if r.brand_id else -1 for r in rows], dtype=np.int32)
+        seller = np.array([seller_codes.setdefault(r.seller_id, len(seller_codes)) if r.seller_id else -1 for r in rows], dtype=np.int32)
+
+        members: dict[UUID, list[int]] = {}
+        for position, row in enumerate(rows):
+            for category_id in memberships.get(row.id, ()):
+                members.setdefault(category_id, []).append(position)
+        categories = {}
+        # Categories missing from the closure no longer exist.
+        for category_id, positions in members.items():
+            if category_id in subtrees:
+                bitmap = np.zeros(len(rows), dtype=bool)
+                bitmap[positions] = True
+                categories[category_id] = bitmap
+
+        return cls(
+            version=version,
+            rows=rows,
+            id_rank=id_rank,
+            sorted_ids=sorted(ids),
+            created_at=np.array([r.created_at for r in rows], dtype="datetime64[us]").astype(np.int64).astype(np.float64),
+            selling_price=np.array([float(r.selling_price or 0) for r in rows], dtype=np.float64),
+            mrp=np.array([float(r.mrp or 0) for r in rows], dtype=np.float64),
+            discount=np.array([float(r.discount_percent or 0) for r in rows], dtype=np.float64),
+            stock=np.array([r.stock_quantity or 0 for r in rows], dtype=np.int64),
+            units_sold=np.array([r.units_sold or 0 for r in rows], dtype=np.float64),
+            is_featured=np.array([bool(r.is_featured) for r in rows], dtype=bool),
+            is_discounted_featured=np.array([bool(r.is_discounted_featured) for r in rows], dtype=bool),
+            brand=brand,
+            seller=seller,
+            brand_codes=brand_codes,
+            seller_codes=seller_codes,
+            categories=categories,
+            subtrees=subtrees,
+            built_at=time.monotonic(),
+        )
+
+    def rank_of(self, product_id: UUID) -> float:
+        """``id_rank`` of ``product_id``; ids not in the snapshot fall between their neighbours."""
+        position = bisect_left(self.sorted_ids, product_id.int)
+        if position < len(self.sorted_ids) and self.sorted_ids[position] == product_id.int:
+            return float(position)
+        return position - 0.5
+
+    def mask(self, filters: dict[str, Any]) -> Any:
+        """Boolean array of the products matching ``filters``."""
+        mask = np.ones(len(self.rows), dtype=bool)
+        category_id = filters.get("category_id")
+        if category_id:
+            category_id = _uuid(category_id)
+            ids = self.subtrees.get(category_id, []) if filters.get("include_descendants") else [category_id]
+            members = np.zeros(len(self.rows), dtype=bool)
+            for member_of in ids:
+                if member_of in self.categories:
+                    members |= self.categories[member_of]
+            mask &= members
+        if filters.get("brand_id"):
+            mask &= self.brand == self.brand_codes.get(_uuid(filters["brand_id"]), -2)
+        if filters.get("seller_id") is not None:
+            mask &= self.seller == self.seller_codes.get(_uuid(filters["seller_id"]), -2)
+        if filters.get("is_featured") is not None:
+            mask &= self.is_featured == bool(filters["is_featured"])
+        if filters.get("is_discounted_featured") is not None:
+            mask &= self.is_discounted_featured == bool(filters["is_discounted_featured"])
+        if filters.get("min_price") is not None:
+            mask &= self.selling_price >= float(filters["min_price"])
+        if filters.get("max_price") is not None:
+            mask &= self.selling_price <= float(filters["max_price"])
+        if filters.get("min_discount") is not None:
+            mask &= self.discount >= float(filters["min_discount"])
+        if filters.get("in_stock") is not None:
+            mask &= self.stock > 0 if filters["in_stock"] else self.stock <= 0
+        return mask
+
+    def page(
+        self,
+        sort_keys: SortKeys,
+        after: Optional[tuple[Any, ...]],
+        skip: int,
+        limit: int,
+        filters: dict[str, Any],
+    ) -> tuple[list[Any], int]:
+        """
+        Up to ``limit + 1`` rows in ``sort_keys`` order starting after the
+        ``after`` sort values (or at ``skip``), and the number of rows
+        matching ``filters``.
+        """
+        keys = getattr(self, KEY_ARRAYS[sort_keys.columns[0].key])
+        matches = np.flatnonzero(self.mask(filters))
+        total = len(matches)
+        if after is not None:
+            value, rank = _key_value(after[0]), self.rank_of(after[1])
+            values, ranks = keys[matches], self.id_rank[matches]
+            if sort_keys.descending:
+                matches = matches[(values < value) | ((values == value) & (ranks < rank))]
+            else:
+                matches = matches[(values > value) | ((values == value) & (ranks > rank))]
+
+        window = skip + limit + 1
+        if len(matches) > PARTITION_FACTOR * window:
+            # Keep everything tied with the window's last key so the id
+            # tie-break below still sees every candidate.
+            values = keys[matches] if not sort_keys.descending else -keys[matches]
+            cutoff = np.partition(values, window - 1)[window - 1]
+            matches = matches[values <= cutoff]
+        # lexsort orders by the last key first: sort key, then id.
+        order = np.lexsort((self.id_rank[matches], keys[matches]))
+        if sort_keys.descending:
+            order = order[::-1]
+        chosen = matches[order[skip:window]]
+        return [self.rows[position] for position in chosen], total
+
+    def facet_counts(self, filters: dict[str, Any], price_edges, discount_steps) -> dict[str, dict[Any, int]]:
+        """``product_facets`` counts for ``filters`` from one mask."""
+        mask = self.mask(filters)
+        # Codes are shifted by one so products without a brand/seller land in 0.
+        brands = np.bincount(self.brand[mask] + 1, minlength=len(self.brand_codes) + 1)
+        prices = np.bincount(
+            np.searchsorted(np.asarray(price_edges, dtype=np.float64), self.selling_price[mask], side="right"),
+            minlength=len(price_edges) + 1,
+        )
+        discounts = np.bincount(
+            np.searchsorted(np.asarray(discount_steps, dtype=np.float64), self.discount[mask], side="right"),
+            minlength=len(discount_steps) + 1,
+        )
+        in_stock = int(np.count_nonzero(self.stock[mask] > 0))
+        categories = {
+            category_id: int(np.count_nonzero(bitmap & mask)) for category_id, bitmap in self.categories.items()
+        }
+        return {
+            "brand": {brand_id: int(brands[code + 1]) for brand_id, code in self.brand_codes.items() if brands[code + 1]},
+            "category": {category_id: count for category_id, count in categories.items() if count},
+            "price": {bucket: int(count) for bucket, count in enumerate(prices) if count},
+            "discount": {bucket: int(count) for bucket, count in enumerate(discounts) if count},
+            "stock": {key: count for key, count in ((1, in_stock), (0, int(mask.sum()) - in_stock)) if count},
+        }
+
+
+class ProductSnapshot:
+    """Holds the current ``SnapshotColumns`` and catches up with product writes."""
+
+    def __init__(self) -> None:
+        self.columns: Optional[SnapshotColumns] = None
+        self._records: dict[UUID, Any] = {}
+        self._memberships: dict[UUID, set[UUID]] = {}
+        self._loaded = False
+        self._synced_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.product_snapshot_enabled and np is not None
+
+    @staticmethod
+    def can_filter(filters: dict[str, Any]) -> bool:
+        """Whether the snapshot can evaluate ``filters``."""
+        if filters.get("is_active", True) is not True or filters.get("search"):
+            return False
+        return all(value is None or name in SUPPORTED_FILTERS for name, value in filters.items())
+
+    @classmethod
+    def can_serve(cls, sort_keys: SortKeys, filters: dict[str, Any]) -> bool:
+        """Whether a listing with these sort keys and filters can be answered from the snapshot."""
+        if len(sort_keys.columns) != 2 or sort_keys.columns[0].key not in KEY_ARRAYS:
+            return False
+        return cls.can_filter(filters)
+
+    async def current(self, session: AsyncSession) -> SnapshotColumns:
+        """The snapshot for the current catalog version, refreshed first if it is stale."""
+        if self._fresh(self.columns):
+            return self.columns
+        return await self.refresh(session)
+
+    @staticmethod
+    def _fresh(columns: Optional[SnapshotColumns]) -> bool:
+        return (
+            columns is not None
+            and columns.version == catalog_version.value
+            and time.monotonic() - columns.built_at <= settings.catalog_index_max_age_seconds
+        )
+
+    async def refresh(self, session: AsyncSession) -> SnapshotColumns:
+        async with self._lock:
+            version = catalog_version.value
+            if self._fresh(self.columns):
+                return self.columns
+
+            query = select(
+                *listing_columns(),
+                Product.brand_id,
+                Product.is_discounted_featured,
+                Product.is_active,
+                Product.updated_at,
+            )
+            if not self._loaded:
+                query = query.where(Product.is_active == True)
+            elif self._synced_at is not None:
+                query = query.where(Product.updated_at > self._synced_at - SINCE_OVERLAP)
+            rows = (await session.execute(query)).all()
+
+            for row in rows:
+                if row.is_active:
+                    self._records[row.id] = row
+                else:
+                    self._records.pop(row.id, None)
+                    self._memberships.pop(row.id, None)
+                if row.updated_at and (self._synced_at is None or row.updated_at > self._synced_at):
+                    self._synced_at = row.updated_at
+
+            membership_query = select(ProductCategory.product_id, ProductCategory.category_id)
+            changed = [row.id for row in rows if row.is_active]
+            if self._loaded and len(changed) <= MEMBERSHIP_DELTA_LIMIT:
+                membership_query = membership_query.where(ProductCategory.product_id.in_(changed))
+                for product_id in changed:
+                    self._memberships.pop(product_id, None)
+            else:
+                self._memberships = {}
+            if changed or not self._loaded:
+                for row in (await session.execute(membership_query)).all():
+                    if row.product_id in self._records:
+                        self._memberships.setdefault(row.product_id, set()).add(row.category_id)
+
+            subtrees: dict[UUID, list[UUID]] = {}
+            closure = await session.execute(select(CategoryClosure.ancestor_id, CategoryClosure.descendant_id))
+            for row in closure.all():
+                subtrees.setdefault(row.ancestor_id, []).append(row.descendant_id)
+
+            self.columns = await asyncio.to_thread(
+                SnapshotColumns.build, self._records, self._memberships, subtrees, version
+            )
+            self._loaded = True
+            return self.columns
+
+
+product_snapshot = ProductSnapshot()
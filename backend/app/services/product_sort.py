@@ -0,0 +1,67 @@
+"""
+Whitelisted orderings for public product listings.
+
+Every ordering ends with ``id`` in the same direction as its other keys,
+so no two rows tie: pages are stable (and therefore cacheable) and a
+keyset cursor can compare the whole sort key as one row value. Each
+ordering has a matching ``(is_active, ..., id)`` index created in
+``run_startup_migrations``.
+"""
+import enum
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable
+from uuid import UUID
+
+from app.models.product import Product
+
+
+class ProductSort(str, enum.Enum):
+    # Search relevance when searching, otherwise newest first.
+    RELEVANCE = "relevance"
+    NEWEST = "newest"
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    DISCOUNT = "discount"
+    NAME = "name"
+    POPULARITY = "popularity"
+
+
+@dataclass(frozen=True)
+class SortKeys:
+    """Columns of an ordering, their direction and how to read them back from a cursor."""
+    columns: tuple[Any, ...]
+    parsers: tuple[Callable[[Any], Any], ...]
+    descending: bool = True
+
+    def order_by(self) -> list[Any]:
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def parse(self, values: list[Any]) -> tuple[Any, ...]:
+        """Typed sort values from a decoded cursor; raises ValueError/TypeError when malformed."""
+        if len(values) != len(self.parsers):
+            raise ValueError("wrong number of cursor values")
+        return tuple(parse(value) for parse, value in zip(self.parsers, values))
+
+
+def _decimal(value: Any) -> Decimal:
+    return Decimal(str(value))
+
+
+_NEWEST = SortKeys((Product.created_at, Product.id), (datetime.fromisoformat, UUID))
+
+SORT_KEYS: dict[ProductSort, SortKeys] = {
+    ProductSort.RELEVANCE: _NEWEST,
+    ProductSort.NEWEST: _NEWEST,
+    ProductSort.PRICE_ASC: SortKeys((Product.selling_price, Product.id), (_decimal, UUID), descending=False),
+    ProductSort.PRICE_DESC: SortKeys((Product.selling_price, Product.id), (_decimal, UUID)),
+    ProductSort.DISCOUNT: SortKeys((Product.discount_percent, Product.id), (_decimal, UUID)),
+    ProductSort.NAME: SortKeys((Product.name, Product.id), (str, UUID), descending=False),
+    ProductSort.POPULARITY: SortKeys((Product.units_sold, Product.id), (int, UUID)),
+}
+
+
+def with_rank(keys: SortKeys, rank) -> SortKeys:
+    """``keys`` with a descending search ``rank`` in front."""
+    return SortKeys((rank, *keys.columns), (float, *keys.parsers), keys.descending)
@@ -0,0 +1,239 @@
+"""
+In-memory typeahead index for ``/products/suggest``.
+
+Every product name, SKU, brand and category is stored under one key per
+word position ("absolute matte lipstick", "matte lipstick", "lipstick"),
+folded and kept in a single sorted list. A query is a ``bisect`` into
+that list followed by a short bounded scan, so completions for any prefix
+cost microseconds regardless of catalog size and with no row cap.
+
+The index tracks the catalog version. Requests never wait for a refresh
+once the index exists: a stale index (version moved, or older than
+``CATALOG_INDEX_MAX_AGE_SECONDS``) keeps answering while a background task
+catches up. A refresh reads only the products whose ``updated_at`` moved
+since the last one, plus the small brand and category tables, and patches
+just the changed keys in place; large changes rebuild it off the event
+loop.
+"""
+import asyncio
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import settings
+from app.core.catalog_version import catalog_version
+from app.database import run_in_session
+from app.models.brand import Brand
+from app.models.category import Category
+from app.models.product import Product
+from app.services.product_fuzzy import fold
+from app.services.product_search import search_tokens
+
+# Keys per entry: one for each of the first few words of its text.
+MAX_KEY_WORDS = 6
+# Entries looked at past the bisect point before ranking; bounds the work
+# for one-letter prefixes that match a large part of the catalog.
+MAX_SCAN = 256
+# Above this share of changed rows a full rebuild beats patching.
+REBUILD_RATIO = 0.1
+# Product deltas overlap the previous refresh so a write timestamped just
+# before it but committed after it is not missed.
+SINCE_OVERLAP = timedelta(seconds=60)
+
+# Tie-break between entries with the same key: brands and categories first,
+# then products whose name starts with the query, then the rest.
+_KIND_RANK = {"brand": 0, "category": 1, "product": 2, "sku": 4}
+
+
+def _keys(kind: str, text: Optional[str]) -> list[tuple[str, int]]:
+    words = search_tokens(fold(text))
+    if kind == "sku":
+        return [(" ".join(words), _KIND_RANK[kind])] if words else []
+    return [
+        (" ".join(words[i:]), _KIND_RANK[kind] + (1 if i else 0))
+        for i in range(min(len(words), MAX_KEY_WORDS))
+    ]
+
+
+class SuggestIndex:
+    """Sorted ``(key, rank, entry_id)`` tuples over the active catalog."""
+
+    def __init__(self) -> None:
+        self.version: Optional[int] = None
+        self._keys: list[tuple[str, int, str]] = []
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._refreshed_at = 0.0
+        self._synced_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _entry_keys(entry_id: str, entry: dict[str, Any]) -> list[tuple[str, int, str]]:
+        keys = _keys(entry["type"], entry["text"])
+        if entry["type"] == "product" and entry.get("sku"):
+            keys += _keys("sku", entry["sku"])
+        return [(key, rank, entry_id) for key, rank in keys]
+
+    def build(self, entries: dict[str, dict[str, Any]], version: Optional[int] = None) -> None:
+        """Replace the index contents with ``entries`` keyed by entry id."""
+        keys = sorted(key for entry_id, entry in entries.items() for key in self._entry_keys(entry_id, entry))
+        self._keys, self._entries = keys, entries
+        self.version = version
+
+    def changed_ids(self, entries: dict[str, dict[str, Any]]) -> list[str]:
+        """Ids of entries added, removed or modified relative to the index."""
+        old = self._entries
+        changed = [i for i, entry in entries.items() if old.get(i) != entry]
+        changed += [i for i in old if i not in entries]
+        return changed
+
+    def patch(
+        self,
+        entries: dict[str, dict[str, Any]],
+        changed: list[str],
+        version: Optional[int] = None,
+    ) -> None:
+        """Bring the index in line with ``entries``, re-keying only the ``changed`` ids."""
+        old = self._entries
+        for entry_id in changed:
+            if entry_id in old:
+                for key in self._entry_keys(entry_id, old[entry_id]):
+                    position = bisect_left(self._keys, key)
+                    if position < len(self._keys) and self._keys[position] == key:
+                        del self._keys[position]
+            if entry_id in entries:
+                for key in self._entry_keys(entry_id, entries[entry_id]):
+                    insort(self._keys, key)
+        self._entries = entries
+        self.version = version
+
+    def suggest(self, query: str, limit: int = 8) -> list[dict[str, Any]]:
+        """Top ``limit`` entries with a key starting with the folded ``query``."""
+        prefix = " ".join(search_tokens(fold(query)))
+        if not prefix:
+            return []
+        # A trailing space means the last word is complete.
+        if query[-1:].isspace():
+            prefix += " "
+        start = bisect_left(self._keys, (prefix,))
+        candidates: dict[str, tuple[int, int]] = {}
+        for key, rank, entry_id in self._keys[start:start + MAX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            score = (rank, len(key))
+            if entry_id not in candidates or score < candidates[entry_id]:
+                candidates[entry_id] = score
+        ranked = sorted(candidates, key=candidates.__getitem__)[:limit]
+        return [self._entries[entry_id] for entry_id in ranked]
+
+    def _fresh(self) -> bool:
+        return (
+            self.version == catalog_version.value
+            and time.monotonic() - self._refreshed_at <= settings.catalog_index_max_age_seconds
+        )
+
+    async def current(self, session: AsyncSession) -> "SuggestIndex":
+        """
+        The index, built first if it never was; a stale one is returned as
+        is while a background refresh catches up.
+        """
+        if self.version is None:
+            await self.refresh(session)
+        elif not self._fresh() and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._refresh_in_background())
+        return self
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await run_in_session(self.refresh)
+        except Exception as exc:
+            print(f"Suggest index: background refresh failed: {exc}")
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Catch up with product writes since the last refresh if the index is stale."""
+        async with self._lock:
+            if self._fresh():
+                return
+            version = catalog_version.value
+            since = self._synced_at - SINCE_OVERLAP if self._synced_at is not None else None
+            products, removed, synced_at = await _load_products(session, since)
+            if self.version is None:
+                entries = products
+            else:
+                entries = {entry_id: entry for entry_id, entry in self._entries.items() if entry_id.startswith("p:")}
+                entries.update(products)
+                for entry_id in removed:
+                    entries.pop(entry_id, None)
+            entries.update(await _load_taxonomy(session))
+            changed = self.changed_ids(entries)
+            if self.version is None or len(changed) > REBUILD_RATIO * max(len(entries), 1):
+                await asyncio.to_thread(self.build, entries, version)
+            else:
+                self.patch(entries, changed, version)
+            self._refreshed_at = time.monotonic()
+            if synced_at is not None:
+                self._synced_at = max(synced_at, self._synced_at or synced_at)
+
+
+async def _load_taxonomy(session: AsyncSession) -> dict[str, dict[str, Any]]:
+    """Entries for every active brand and category (both tables are small)."""
+    entries: dict[str, dict[str, Any]] = {}
+    brands = await session.execute(select(Brand.id, Brand.name, Brand.slug).where(Brand.is_active == True))
+    for row in brands.all():
+        entries[f"b:{row.id}"] = {"type": "brand", "text": row.name, "slug": row.slug, "id": str(row.id)}
+    categories = await session.execute(
+        select(Category.id, Category.name, Category.slug).where(Category.is_active == True)
+    )
+    for row in categories.all():
+        entries[f"c:{row.id}"] = {"type": "category", "text": row.name, "slug": row.slug, "id": str(row.id)}
+    return entries
+
+
+async def _load_products(
+    session: AsyncSession, since: Optional[datetime] = None
+) -> tuple[dict[str, dict[str, Any]], list[str], Optional[datetime]]:
+    """
+    Entries for active products (only those changed after ``since`` when
+    given), ids of changed products that are no longer active, and the
+    newest ``updated_at`` read.
+    """
+    query = select(
+        Product.id,
+        Product.name,
+        Product.slug,
+        Product.sku,
+        Product.selling_price,
+        Product.image_url,
+        Product.is_active,
+        Product.updated_at,
+    )
+    if since is None:
+        query = query.where(Product.is_active == True)
+    else:
+        query = query.where(Product.updated_at > since)
+    entries: dict[str, dict[str, Any]] = {}
+    removed: list[str] = []
+    synced_at: Optional[datetime] = None
+    for row in (await session.execute(query)).all():
+        if row.updated_at and (synced_at is None or row.updated_at > synced_at):
+            synced_at = row.updated_at
+        if not row.is_active:
+            removed.append(f"p:{row.id}")
+            continue
+        entries[f"p:{row.id}"] = {
+            "type": "product",
+            "text": row.name,
+            "slug": row.slug,
+            "id": str(row.id),
+            "sku": row.sku,
+            "selling_price": float(row.selling_price),
+            "image": row.image_url,
+        }
+    return entries, removed, synced_at
+
+
+suggest_index = SuggestIndex()
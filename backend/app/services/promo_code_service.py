@@ -1,5 +1,6 @@
 """Promo Code Service"""
 
+import asyncio
 from datetime import datetime
 from decimal import Decimal
 
@@ -8,11 +9,45 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.core.cache import response_cache
+from app.core.catalog_version import catalog_version
 from app.core.exceptions import BadRequestException, NotFoundException
 from app.models.promo_code import PromoCode, PromoCodeCreate, PromoCodeUpdate, PromoDiscountType
 
 MIN_PAYABLE_AFTER_PROMO = Decimal("1.00")
 
+# Expiry times that already have an invalidation scheduled (see below).
+_scheduled_expiries: set[datetime] = set()
+
+
+def clear_public_promo_cache() -> None:
+    # Active promos are also part of the home bootstrap payload.
+    response_cache.clear_prefix("promo_codes_active", "home_bootstrap")
+    catalog_version.bump()
+
+
+def _expire_public_promos(expires_at: datetime) -> None:
+    _scheduled_expiries.discard(expires_at)
+    clear_public_promo_cache()
+
+
+def schedule_expiry_invalidation(promos: list[PromoCode]) -> None:
+    """
+    Invalidate public promo listings once a listed promo expires.
+
+    Expiry isn't a write, so nothing else would bump the catalog version and
+    revalidating clients would keep seeing the expired promo.
+    """
+    loop = asyncio.get_running_loop()
+    now = datetime.utcnow()
+    for promo in promos:
+        expires_at = promo.expires_at
+        if expires_at is None or expires_at < now or expires_at in _scheduled_expiries:
+            continue
+        _scheduled_expiries.add(expires_at)
+        # list_active_public still includes a promo at exactly expires_at.
+        delay = (expires_at - now).total_seconds() + 1
+        loop.call_later(delay, _expire_public_promos, expires_at)
+
 
 class PromoCodeService:
     """Service for promo code operations."""
@@ -107,7 +142,7 @@ class PromoCodeService:
         self.session.add(promo)
         await self.session.commit()
         await self.session.refresh(promo)
-        response_cache.clear_prefix("promo_codes_active")
+        clear_public_promo_cache()
         return promo
 
     async def update(self, promo: PromoCode, data: PromoCodeUpdate) -> PromoCode:
@@ -118,7 +153,7 @@ class PromoCodeService:
         self.session.add(promo)
         await self.session.commit()
         await self.session.refresh(promo)
-        response_cache.clear_prefix("promo_codes_active")
+        clear_public_promo_cache()
         return promo
 
     async def validate_for_subtotal(self, code: str, subtotal: Decimal) -> PromoCode:
@@ -152,4 +187,4 @@ class PromoCodeService:
         promo.updated_at = datetime.utcnow()
         self.session.add(promo)
         await self.session.commit()
-        response_cache.clear_prefix("promo_codes_active")
+        clear_public_promo_cache()